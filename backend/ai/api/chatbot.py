@@ -1,9 +1,14 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 
 from ai.orchestrator.tool_selector import ToolSelector
 from ai.tool import QuyDinh
 from ai.config.config import llm
+from schemas.token import TokenData
+from services.auth import get_optional_token_data
+from services.rate_limit import rate_limiter
 
 class QuestionRequest(BaseModel):
     question: str
@@ -25,7 +30,13 @@ def reset_topic_helper() -> None:
 router = APIRouter(prefix="/chatbot", tags=["ChatBot"])
 
 @router.post("/ask")
-def ask_question(req: QuestionRequest):
+def ask_question(
+    req: QuestionRequest,
+    request: Request,
+    token_data: Optional[TokenData] = Depends(get_optional_token_data),
+):
+    # Mỗi câu hỏi gọi LLM tối đa 3 lần: giới hạn theo IP và theo tài khoản (nếu có token)
+    rate_limiter.check("chatbot", request, account=token_data.user_id if token_data else None)
     try:
         answer = ask_question_helper(req.question)
         return {"answer": answer}
@@ -1,21 +1,64 @@
 from fastapi import FastAPI 
 from models.base import Base
-from database.init_db import create_table_db
+from core.config import settings
+from database.init_db import SessionLocal, create_table_db, dispose_async_engine
+from services.availability import availability_index
+from services.contract_sweeper import ContractSweeper
+from services.revenue import rebuild_revenue_rollup_if_empty
+from services.revocation import revoked_accounts, revoked_tokens
+from helpers.pwd import password_pool
 
 from api import auth
 from api import student
 from api import room
 from api import reservation_contact
 from api import invoice
+from api import diagnostics
 from ai.api import chatbot
+
+def build_availability_index():
+  db = SessionLocal()
+  try:
+    availability_index.build(db)
+  finally:
+    db.close()
+
+def ensure_revenue_rollup():
+  db = SessionLocal()
+  try:
+    rebuild_revenue_rollup_if_empty(db)
+  finally:
+    db.close()
+
+def load_revoked_accounts():
+  db = SessionLocal()
+  try:
+    revoked_accounts.load(db)
+    revoked_tokens.load(db)
+  finally:
+    db.close()
+
 def create_app()->FastAPI:
   app = FastAPI()
   
   create_table_db()
+  
+  app.add_event_handler("startup", build_availability_index)
+  app.add_event_handler("startup", load_revoked_accounts)
+  app.add_event_handler("startup", ensure_revenue_rollup)
+  
+  # Luồng nền chuyển hợp đồng hết hạn sang INACTIVE
+  sweeper = ContractSweeper(SessionLocal, settings.CONTRACT_SWEEP_INTERVAL_SECONDS)
+  app.add_event_handler("startup", sweeper.start)
+  app.add_event_handler("shutdown", sweeper.stop)
+  app.add_event_handler("shutdown", password_pool.shutdown)
+  app.add_event_handler("shutdown", dispose_async_engine)
+  
   app.include_router(router=auth.router)
   app.include_router(router=student.router)
   app.include_router(router=room.router)
   app.include_router(router=reservation_contact.router)
   app.include_router(router=invoice.router)
+  app.include_router(router=diagnostics.router)
   app.include_router(router=chatbot.router)
   return app 
\ No newline at end of file
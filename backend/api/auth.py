@@ -1,33 +1,72 @@
-from typing import Any, Dict
+from datetime import datetime
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Body, Depends, Request, status, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.responses import JSONResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from database.init_db import get_db
+from helpers.pwd import PasswordPoolBusy, hash_password_async, verify_and_update_async
 from models.account import Account
-from schemas.account import AccountCreate
-from services.auth import create_access_token, get_current_user
+from models.refresh_token import RefreshToken
+from schemas.account import AccountCreate, UpdateAccount
+from schemas.token import LogoutRequest, RefreshRequest, TokenData
+from services.account_cache import account_cache
+from services.auth import (
+    admin_required,
+    get_current_user,
+    get_token_data,
+    hash_refresh_token,
+    issue_tokens,
+    load_account,
+    revoke_refresh_tokens,
+    rotate_refresh_token,
+    set_account_active,
+)
+from services.revocation import revoked_tokens
+from services.rate_limit import rate_limiter
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+password_pool_busy = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Hệ thống đang bận, vui lòng thử lại sau",
+    headers={"Retry-After": "1"},
+)
+
 
 @router.post("/register", summary="Đăng ký tài khoản mới")
-def register(
+async def register(
     data: AccountCreate,
     db: Session = Depends(get_db)
 ) -> JSONResponse:
     """
     API đăng ký tài khoản mới cho sinh viên.
-    - Kiểm tra username trùng.
-    - Tạo mới Account + Student.
+    - Băm mật khẩu trên pool process, thao tác DB chạy trong threadpool.
+    - Tạo mới Account + Student trong một transaction.
+    - Trùng username / phone / email trả 409 kèm các trường bị trùng.
     """
     try:
-        status_code, account, student = Account.create_account(db, data)
+        password_hash = await hash_password_async(data.password)
+    except PasswordPoolBusy:
+        raise password_pool_busy
+
+    try:
+        status_code, account, student = await run_in_threadpool(
+            Account.create_account, db, data, password_hash
+        )
 
         success = status_code == 201
-        message = "Đăng ký tài khoản thành công" if success else "Tên đăng nhập đã tồn tại"
+        message = "Đăng ký tài khoản thành công"
+        conflicts = []
+        if not success:
+            conflicts = await run_in_threadpool(
+                Account.find_conflicts, db, data.username, data.student.phone, data.student.email
+            )
+            message = "Tên đăng nhập đã tồn tại" if conflicts in ([], ["username"]) else "Thông tin đã tồn tại"
 
         return JSONResponse(
             status_code=status_code,
@@ -44,6 +83,7 @@ def register(
                         "phone": student.phone,
                         "email": student.email,
                     } if success else None,
+                    "conflicts": conflicts,
                 },
             },
         )
@@ -60,33 +100,168 @@ def register(
         )
 
 
+def _finish_login(db: Session, account: Account, student_id: Optional[int], new_hash: Optional[str]) -> dict:
+    # Băm lại mật khẩu (nếu cost đổi) và lưu refresh token trong cùng một commit
+    if new_hash:
+        account.password = new_hash
+    tokens = issue_tokens(db, account, student_id=student_id)
+    db.commit()
+    account_cache.invalidate(account.id)
+    return tokens
+
+
+def _load_login_account(db: Session, username: str):
+    account = Account.get_by_username(db, username)
+    if not account:
+        return None, None
+    return account, account.student.id if account.student else None
+
+
 @router.post("/login", summary="Đăng nhập và lấy access token")
-def login(
+async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ) -> JSONResponse:
     """
     API đăng nhập.
-    - Kiểm tra username + password.
+    - Kiểm tra username + password (bcrypt chạy trên pool process).
+    - Hash cũ khác BCRYPT_ROUNDS được băm lại và lưu ngay.
     - Trả về JWT access_token nếu thành công.
+    - Giới hạn số lần thử theo IP và theo username (429 + Retry-After).
     """
-    status_code, account = Account.authenticate(db, form_data.username, form_data.password)
-    if status_code != 200:
+    rate_limiter.check("login", request, account=form_data.username)
+
+    account, student_id = await run_in_threadpool(_load_login_account, db, form_data.username)
+
+    valid, new_hash = False, None
+    if account:
+        try:
+            valid, new_hash = await verify_and_update_async(form_data.password, account.password)
+        except PasswordPoolBusy:
+            raise password_pool_busy
+
+    if not valid:
         raise HTTPException(
-            status_code=status_code,
+            status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Tên đăng nhập hoặc mật khẩu không chính xác",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token = create_access_token(subject=str(account.id))
+    if not account.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Tài khoản đã bị khóa",
+        )
+
+    tokens = await run_in_threadpool(_finish_login, db, account, student_id, new_hash)
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
             "success": True,
             "message": "Đăng nhập thành công",
-            "access_token": access_token,
-            "token_type": "bearer",
+            **tokens,
+        },
+    )
+
+
+@router.post("/refresh", summary="Lấy access token mới bằng refresh token")
+def refresh(
+    data: RefreshRequest,
+    db: Session = Depends(get_db)
+) -> JSONResponse:
+    """
+    API đổi refresh token lấy cặp token mới, không cần nhập lại mật khẩu.
+    - Refresh token cũ hết hiệu lực ngay (rotation).
+    - Gửi lại refresh token đã dùng: thu hồi toàn bộ phiên đăng nhập đó.
+    """
+    tokens = rotate_refresh_token(db, data.refresh_token)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "success": True,
+            "message": "Làm mới token thành công",
+            **tokens,
+        },
+    )
+
+
+@router.post("/logout", summary="Đăng xuất")
+def logout(
+    data: Optional[LogoutRequest] = None,
+    token_data: TokenData = Depends(get_token_data),
+    db: Session = Depends(get_db)
+) -> JSONResponse:
+    """
+    API đăng xuất.
+    - Thu hồi access token hiện tại (jti) tới khi nó hết hạn.
+    - Có refresh_token: thu hồi phiên đó; không có: thu hồi mọi phiên của tài khoản.
+    - refresh_token không thuộc tài khoản / không tồn tại: 400, không thu hồi gì.
+    """
+    conditions = [RefreshToken.account_id == token_data.id]
+    if data and data.refresh_token:
+        family_id = db.execute(
+            select(RefreshToken.family_id).where(
+                RefreshToken.token_hash == hash_refresh_token(data.refresh_token),
+                RefreshToken.account_id == token_data.id,
+            )
+        ).scalar_one_or_none()
+        if family_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Refresh token không hợp lệ"
+            )
+        conditions.append(RefreshToken.family_id == family_id)
+    revoke_refresh_tokens(db, *conditions)
+    db.commit()
+    if token_data.jti:
+        revoked_tokens.revoke(token_data.jti, token_data.exp)
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"success": True, "message": "Đăng xuất thành công"},
+    )
+
+
+def _change_password(db: Session, account: Account, password_hash: str, student_id: Optional[int]) -> dict:
+    account.password = password_hash
+    revoke_refresh_tokens(db, RefreshToken.account_id == account.id)
+    not_before = revoked_tokens.revoke_account(account.id)
+    account.tokens_valid_after = datetime.utcfromtimestamp(not_before)
+    account_cache.invalidate(account.id)
+    tokens = issue_tokens(db, account, student_id=student_id)
+    db.commit()
+    return tokens
+
+
+@router.put("/password", summary="Đổi mật khẩu")
+async def change_password(
+    data: UpdateAccount,
+    token_data: TokenData = Depends(get_token_data),
+    db: Session = Depends(get_db)
+) -> JSONResponse:
+    """
+    API đổi mật khẩu.
+    - Mọi access / refresh token đã cấp trước đó bị thu hồi.
+    - Trả về cặp token mới cho thiết bị đang dùng.
+    """
+    account = await run_in_threadpool(load_account, db, token_data.id)
+    try:
+        valid, _ = await verify_and_update_async(data.old_password, account.password)
+        if not valid:
+            raise HTTPException(status_code=400, detail="Mật khẩu hiện tại không chính xác")
+        password_hash = await hash_password_async(data.password)
+    except PasswordPoolBusy:
+        raise password_pool_busy
+
+    tokens = await run_in_threadpool(_change_password, db, account, password_hash, token_data.student_id)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "success": True,
+            "message": "Đổi mật khẩu thành công",
+            **tokens,
         },
     )
 
@@ -108,3 +283,32 @@ def read_me(current_user: Account = Depends(get_current_user)) -> JSONResponse:
             },
         },
     )
+
+
+@router.put("/accounts/{account_id}/active", summary="Khóa / mở khóa tài khoản")
+def update_account_active(
+    account_id: int,
+    active: bool = Body(..., embed=True),
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(admin_required),
+) -> JSONResponse:
+    """
+    API cho admin khóa hoặc mở khóa tài khoản.
+    - Token đã cấp của tài khoản bị khóa bị từ chối ngay, không chờ hết hạn.
+    """
+    account = db.query(Account).filter(Account.id == account_id).first()
+    if not account:
+        raise HTTPException(status_code=404, detail="Không tìm thấy tài khoản")
+    if account.id == current_user.id and not active:
+        raise HTTPException(status_code=400, detail="Không thể tự khóa tài khoản của mình")
+
+    set_account_active(db, account, active)
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "success": True,
+            "message": "Đã mở khóa tài khoản" if active else "Đã khóa tài khoản",
+            "payload": {"id": account.id, "username": account.username, "is_active": account.is_active},
+        },
+    )
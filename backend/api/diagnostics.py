@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+
+from database.init_db import get_pool_stats
+from helpers.pwd import password_pool
+from schemas.token import TokenData
+from services.auth import admin_required
+from services.rate_limit import rate_limiter
+
+router = APIRouter(prefix="/admin/diagnostics", tags=["Diagnostics"])
+
+
+@router.get("/password-pool", summary="Trạng thái pool băm mật khẩu")
+def password_pool_stats(current_user: TokenData = Depends(admin_required)) -> JSONResponse:
+    """
+    API cho admin xem pool bcrypt: số việc đang chạy, độ sâu hàng đợi, số request bị từ chối (503).
+    """
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "success": True,
+            "message": "Trạng thái pool băm mật khẩu",
+            "payload": password_pool.stats(),
+        },
+    )
+
+
+@router.get("/db-pool", summary="Trạng thái connection pool")
+def db_pool_stats(current_user: TokenData = Depends(admin_required)) -> JSONResponse:
+    """
+    API cho admin xem pool của từng engine (sync / async) trong worker này:
+    số kết nối đang mượn, overflow, histogram thời gian chờ và độ trễ checkout.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "success": True,
+            "message": "Trạng thái connection pool",
+            "payload": get_pool_stats(),
+        },
+    )
+
+
+@router.get("/rate-limit", summary="Thống kê rate limit")
+def rate_limit_stats(current_user: TokenData = Depends(admin_required)) -> JSONResponse:
+    """
+    API cho admin xem số lần kiểm tra, số request bị chặn (429) và overhead của limiter (µs).
+    """
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "success": True,
+            "message": "Thống kê rate limit",
+            "payload": rate_limiter.stats(),
+        },
+    )
@@ -1,17 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
+import codecs
+import csv
+
+from fastapi import APIRouter, Depends, File, HTTPException, Path, Query, UploadFile
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
-from database.init_db import get_db
+from database.init_db import SessionLocal, get_async_db, get_db
 from models.contract import Contract
 from models.invoice import Invoice
+from models.invoice_revenue import InvoiceRevenue
 from models.reservation import Reservation
+from models.room import Room
 from models.students import Student
 from models.account import Account
 from helpers.contract_status import ContractStatus
-from services.auth import admin_required, get_current_user
+from helpers.invoice_status import InvoiceStatus
+from helpers.cursor import decode_cursor, encode_cursor
+from helpers.export import export_response
+from helpers.query_counter import count_queries
+from helpers.reference_code import make_reference_code, parse_reference_code
+from schemas.invoice import InvoiceBatchPayRequest
+from services.auth import admin_required, get_current_user, get_current_user_async
+from services.revenue import (
+    add_revenue_delta,
+    apply_revenue_deltas,
+    new_revenue_deltas,
+    payment_deltas,
+)
 
 router = APIRouter(prefix="/invoices", tags=["Invoices"])
 
+# Số dòng mỗi lần executemany khi tạo phiếu thu hàng loạt
+INVOICE_BATCH_SIZE = 500
+
+# Đối soát sao kê: số id mỗi câu UPDATE, sai số số tiền (VNĐ) và số dòng tối đa trong báo cáo
+RECONCILE_BATCH_SIZE = 1000
+RECONCILE_AMOUNT_TOLERANCE = 1.0
+RECONCILE_REPORT_LIMIT = 1000
+
 # ============================
 # Admin generate invoices
 # ============================
@@ -22,72 +49,79 @@ def generate_invoices(
     db: Session = Depends(get_db),
     current_user=Depends(admin_required),
 ):
+    """
+    Tạo phiếu thu hàng loạt cho tháng month/year.
+    - Số sinh viên active mỗi phòng và các phiếu thu đã tồn tại được tính bằng vài
+      query tổng hợp thay vì lazy-load từng contract.
+    - Các phiếu thu mới được insert theo lô (executemany).
+    """
     today = datetime.utcnow().date()
 
-    contracts = (
-        db.query(Contract)
-        .filter(
-            Contract.status == ContractStatus.ACTIVE,
-            Contract.start_date <= today,
-            Contract.end_date >= today,
+    with count_queries(db) as counter:
+        # Số hợp đồng active trong mỗi phòng (để chia đều tiền phòng)
+        occupants = (
+            select(
+                Reservation.room_id.label("room_id"),
+                func.count(Contract.id).label("occupants"),
+            )
+            .join(Contract, Contract.reservation_id == Reservation.id)
+            .where(Contract.status == ContractStatus.ACTIVE)
+            .group_by(Reservation.room_id)
+            .subquery()
         )
-        .all()
-    )
 
-    invoices = []
-    for c in contracts:
-        # check nếu contract đã có invoice cho tháng này rồi thì bỏ qua
-        existing = (
-            db.query(Invoice)
-            .filter(
-                Invoice.contract_id == c.id,
-                Invoice.month == month,
-                Invoice.year == year,
+        contracts = db.execute(
+            select(Contract.id, Room.id, Room.price, occupants.c.occupants)
+            .join(Reservation, Contract.reservation_id == Reservation.id)
+            .join(Room, Reservation.room_id == Room.id)
+            .join(occupants, occupants.c.room_id == Room.id)
+            .where(
+                Contract.status == ContractStatus.ACTIVE,
+                Contract.start_date <= today,
+                Contract.end_date >= today,
             )
-            .first()
+        ).all()
+
+        # Các contract đã có phiếu thu cho tháng này thì bỏ qua
+        existing = set(
+            db.execute(
+                select(Invoice.contract_id).where(
+                    Invoice.month == month,
+                    Invoice.year == year,
+                )
+            ).scalars()
         )
-        if existing:
-            continue
-
-        room = c.reservation.room
-        if not room:
-            continue
 
-        # Chia đều theo số lượng sinh viên active trong phòng
-        active_reservations = [
-            r for r in room.reservations
-            if r.contract and r.contract.status == ContractStatus.ACTIVE
+        rows = [
+            {
+                "contract_id": contract_id,
+                "room_id": room_id,
+                "amount": price / occupant_count,
+                "month": month,
+                "year": year,
+                "status": InvoiceStatus.UNPAID,
+            }
+            for contract_id, room_id, price, occupant_count in contracts
+            if contract_id not in existing
         ]
-        if not active_reservations:
-            continue
 
-        amount = room.price / len(active_reservations)
+        for i in range(0, len(rows), INVOICE_BATCH_SIZE):
+            db.execute(insert(Invoice), rows[i:i + INVOICE_BATCH_SIZE])
 
-        invoice = Invoice(
-            contract_id=c.id,
-            amount=amount,
-            month=month,
-            year=year,
-            status="UNPAID",
-        )
-        db.add(invoice)
-        invoices.append(invoice)
+        deltas = new_revenue_deltas()
+        for row in rows:
+            add_revenue_delta(
+                deltas, (year, month, row["room_id"], InvoiceStatus.UNPAID), 1, row["amount"]
+            )
+        apply_revenue_deltas(db, deltas)
 
     db.commit()
 
     return {
-        "message": f"Đã tạo {len(invoices)} phiếu thu cho tháng {month}/{year}",
-        "invoices": [
-            {
-                "invoice_id": inv.id,
-                "contract_id": inv.contract_id,
-                "amount": inv.amount,
-                "month": inv.month,
-                "year": inv.year,
-                "status": inv.status,
-            }
-            for inv in invoices
-        ],
+        "message": f"Đã tạo {len(rows)} phiếu thu cho tháng {month}/{year}",
+        "created": len(rows),
+        "skipped": len(contracts) - len(rows),
+        "queries": counter.count,
     }
 
 
@@ -99,22 +133,41 @@ def get_all_invoices(
     month: int = Query(None, description="Tháng cần lọc"),
     year: int = Query(None, description="Năm cần lọc"),
     status: str = Query(None, description="Trạng thái hóa đơn: PAID/UNPAID"),
+    limit: int = Query(50, ge=1, le=500, description="Số hóa đơn mỗi trang"),
+    cursor: str = Query(None, description="next_cursor của trang trước"),
+    include_total: bool = Query(False, description="Trả thêm tổng số hóa đơn (tốn thêm COUNT)"),
     db: Session = Depends(get_db),
     current_user=Depends(admin_required),
 ):
-    query = db.query(Invoice)
-
+    filters = []
     if month:
-        query = query.filter(Invoice.month == month)
+        filters.append(Invoice.month == month)
     if year:
-        query = query.filter(Invoice.year == year)
+        filters.append(Invoice.year == year)
     if status:
-        query = query.filter(Invoice.status == status)
-
-    invoices = query.all()
-
-    return {
-        "count": len(invoices),
+        filters.append(Invoice.status == status)
+
+    # Keyset theo id: chỉ lấy các cột cần trả về, không hydrate ORM
+    query = select(
+        Invoice.id,
+        Invoice.contract_id,
+        Invoice.amount,
+        Invoice.month,
+        Invoice.year,
+        Invoice.status,
+        Invoice.paid_at,
+    ).where(*filters)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1, (int,))
+        query = query.where(Invoice.id > last_id)
+
+    # Lấy dư 1 dòng để biết còn trang sau hay không
+    rows = db.execute(query.order_by(Invoice.id).limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    response = {
+        "count": len(rows),
         "invoices": [
             {
                 "invoice_id": inv.id,
@@ -125,30 +178,81 @@ def get_all_invoices(
                 "status": inv.status,
                 "paid_at": str(inv.paid_at) if inv.paid_at else None,
             }
-            for inv in invoices
+            for inv in rows
         ],
+        "next_cursor": encode_cursor([rows[-1].id]) if has_more else None,
     }
+    if include_total:
+        response["total"] = db.execute(
+            select(func.count(Invoice.id)).where(*filters)
+        ).scalar_one()
+
+    return response
+
+
+# ============================
+# Admin export invoices
+# ============================
+@router.get("/export")
+def export_invoices(
+    month: int = Query(None, description="Tháng cần lọc"),
+    year: int = Query(None, description="Năm cần lọc"),
+    status: str = Query(None, description="Trạng thái hóa đơn: PAID/UNPAID"),
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="csv hoặc ndjson"),
+    gzip: bool = Query(False, description="Nén gzip"),
+    current_user=Depends(admin_required),
+):
+    query = select(
+        Invoice.id,
+        Invoice.contract_id,
+        Invoice.room_id,
+        Invoice.amount,
+        Invoice.month,
+        Invoice.year,
+        Invoice.status,
+        Invoice.created_at,
+        Invoice.paid_at,
+    )
+    if month:
+        query = query.where(Invoice.month == month)
+    if year:
+        query = query.where(Invoice.year == year)
+    if status:
+        query = query.where(Invoice.status == status)
+
+    return export_response(
+        SessionLocal,
+        query.order_by(Invoice.id),
+        columns=[
+            "invoice_id", "contract_id", "room_id", "amount",
+            "month", "year", "status", "created_at", "paid_at",
+        ],
+        filename="invoices",
+        fmt=format,
+        gzip=gzip,
+    )
 
 
 # ============================
 # Student get my invoices
 # ============================
 @router.get("/my")
-def get_my_invoices(
-    db: Session = Depends(get_db),
-    current_user: Account = Depends(get_current_user),
+async def get_my_invoices(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Account = Depends(get_current_user_async),
 ):
-    student = db.query(Student).filter(Student.account_id == current_user.id).first()
+    student = (await db.execute(
+        select(Student).where(Student.account_id == current_user.id)
+    )).scalars().first()
     if not student:
         raise HTTPException(status_code=400, detail="Không tìm thấy thông tin sinh viên")
 
-    invoices = (
-        db.query(Invoice)
+    invoices = (await db.execute(
+        select(Invoice)
         .join(Contract, Invoice.contract_id == Contract.id)
         .join(Reservation, Contract.reservation_id == Reservation.id)
-        .filter(Reservation.student_id == student.id)
-        .all()
-    )
+        .where(Reservation.student_id == student.id)
+    )).scalars().all()
 
     if not invoices:
         raise HTTPException(status_code=404, detail="Bạn chưa có hóa đơn nào")
@@ -159,6 +263,7 @@ def get_my_invoices(
             {
                 "invoice_id": inv.id,
                 "contract_id": inv.contract_id,
+                "reference_code": make_reference_code(inv.contract_id, inv.month, inv.year),
                 "amount": inv.amount,
                 "month": inv.month,
                 "year": inv.year,
@@ -193,11 +298,21 @@ def pay_invoice(
     if not invoice:
         raise HTTPException(status_code=404, detail="Không tìm thấy hóa đơn này của bạn")
 
-    if invoice.status == "PAID":
+    # Chỉ chuyển UNPAID -> PAID trong câu UPDATE: batch pay / reconcile chạy đồng thời
+    # không thể cùng thanh toán một hóa đơn và cộng doanh thu hai lần
+    result = db.execute(
+        update(Invoice)
+        .where(Invoice.id == invoice.id, Invoice.status == InvoiceStatus.UNPAID)
+        .values(status=InvoiceStatus.PAID, paid_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        db.rollback()
         raise HTTPException(status_code=400, detail="Hóa đơn này đã được thanh toán")
 
-    invoice.status = "PAID"
-    invoice.paid_at = datetime.utcnow()
+    apply_revenue_deltas(
+        db, payment_deltas([(invoice.year, invoice.month, invoice.room_id, invoice.amount)])
+    )
     db.commit()
     db.refresh(invoice)
 
@@ -214,9 +329,249 @@ def pay_invoice(
     }
 
 
+# ============================
+# Batch pay invoices
+# ============================
+def _settle_invoices(db: Session, invoice_ids, account_id: int = None):
+    """
+    Thanh toán nhiều hóa đơn trong một transaction.
+    - account_id != None: chỉ thanh toán hóa đơn thuộc sinh viên của account đó
+      (kiểm tra quyền sở hữu bằng một query join).
+    - Đánh dấu PAID bằng một câu UPDATE duy nhất.
+    """
+    invoice_ids = list(dict.fromkeys(invoice_ids))
+
+    query = select(
+        Invoice.id,
+        Invoice.status,
+        Invoice.year,
+        Invoice.month,
+        Invoice.room_id,
+        Invoice.amount,
+    ).where(Invoice.id.in_(invoice_ids))
+    if account_id is not None:
+        query = (
+            query.join(Contract, Invoice.contract_id == Contract.id)
+            .join(Reservation, Contract.reservation_id == Reservation.id)
+            .join(Student, Reservation.student_id == Student.id)
+            .where(Student.account_id == account_id)
+        )
+    found = {row.id: row for row in db.execute(query.with_for_update())}
+
+    payable = [row for row in found.values() if row.status != InvoiceStatus.PAID]
+    paid_at = datetime.utcnow()
+    if payable:
+        db.execute(
+            update(Invoice)
+            .where(
+                Invoice.id.in_([row.id for row in payable]),
+                Invoice.status != InvoiceStatus.PAID,
+            )
+            .values(status=InvoiceStatus.PAID, paid_at=paid_at)
+        )
+        apply_revenue_deltas(
+            db,
+            payment_deltas((row.year, row.month, row.room_id, row.amount) for row in payable),
+        )
+    db.commit()
+
+    results = []
+    for invoice_id in invoice_ids:
+        row = found.get(invoice_id)
+        if row is None:
+            results.append({"invoice_id": invoice_id, "result": "not_found"})
+        elif row.status == InvoiceStatus.PAID:
+            results.append({"invoice_id": invoice_id, "result": "already_paid"})
+        else:
+            results.append({
+                "invoice_id": invoice_id,
+                "result": "paid",
+                "amount": row.amount,
+                "month": row.month,
+                "year": row.year,
+                "paid_at": str(paid_at),
+            })
+
+    return {
+        "message": f"Đã thanh toán {len(payable)}/{len(invoice_ids)} hóa đơn",
+        "paid": len(payable),
+        "paid_amount": sum(row.amount for row in payable),
+        "results": results,
+    }
+
+
+@router.put("/pay-batch")
+def pay_invoices_batch(
+    data: InvoiceBatchPayRequest,
+    db: Session = Depends(get_db),
+    current_user: Account = Depends(get_current_user),
+):
+    return _settle_invoices(db, data.invoice_ids, account_id=current_user.id)
+
+
+@router.put("/admin/pay-batch")
+def admin_pay_invoices_batch(
+    data: InvoiceBatchPayRequest,
+    db: Session = Depends(get_db),
+    current_user=Depends(admin_required),
+):
+    """Admin ghi nhận thanh toán (tiền mặt...) cho hóa đơn của nhiều sinh viên"""
+    return _settle_invoices(db, data.invoice_ids)
+
+
+# ============================
+# Admin bank statement reconciliation
+# ============================
+def _report_line(report: list, line: int, reason: str, row: dict) -> None:
+    if len(report) < RECONCILE_REPORT_LIMIT:
+        report.append({"line": line, "reason": reason, "row": row})
+
+
+def _decode_lines(raw_lines):
+    """Giải mã UTF-8 từng dòng; file sai mã hóa trả 400 thay vì 500"""
+    try:
+        yield from codecs.iterdecode(raw_lines, "utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File sao kê phải được mã hóa UTF-8")
+
+
+@router.post("/reconcile")
+def reconcile_bank_statement(
+    file: UploadFile = File(..., description="Sao kê CSV, cần cột description (hoặc reference) và amount"),
+    db: Session = Depends(get_db),
+    current_user=Depends(admin_required),
+):
+    """
+    Đối soát sao kê ngân hàng với hóa đơn UNPAID.
+    - Index hash (contract_id, month, year) -> hóa đơn UNPAID được dựng bằng một query.
+    - Sao kê được đọc dạng stream, mỗi dòng tra index O(1).
+    - Các hóa đơn khớp được đánh dấu PAID theo lô.
+    """
+    index = {}
+    for row in db.execute(
+        select(
+            Invoice.id,
+            Invoice.contract_id,
+            Invoice.month,
+            Invoice.year,
+            Invoice.room_id,
+            Invoice.amount,
+        ).where(Invoice.status == InvoiceStatus.UNPAID)
+    ):
+        index.setdefault((row.contract_id, row.month, row.year), []).append(row)
+
+    reader = csv.DictReader(_decode_lines(file.file))
+    if not reader.fieldnames or "amount" not in reader.fieldnames:
+        raise HTTPException(status_code=400, detail="File sao kê phải có cột amount")
+
+    matched, matched_lines = {}, {}
+    unmatched, ambiguous = [], []
+    unmatched_count = ambiguous_count = lines = 0
+    for line, row in enumerate(reader, start=2):
+        lines += 1
+        key = parse_reference_code(row.get("description") or row.get("reference"))
+        if key is None:
+            unmatched_count += 1
+            _report_line(unmatched, line, "no_reference", row)
+            continue
+
+        try:
+            paid_amount = float(str(row["amount"]).replace(",", ""))
+        except ValueError:
+            unmatched_count += 1
+            _report_line(unmatched, line, "invalid_amount", row)
+            continue
+
+        candidates = index.get(key)
+        if not candidates:
+            unmatched_count += 1
+            _report_line(unmatched, line, "no_unpaid_invoice", row)
+        elif len(candidates) > 1:
+            ambiguous_count += 1
+            _report_line(ambiguous, line, "multiple_invoices", row)
+        elif candidates[0].id in matched:
+            ambiguous_count += 1
+            _report_line(ambiguous, line, "duplicate_payment", row)
+        elif abs(candidates[0].amount - paid_amount) >= RECONCILE_AMOUNT_TOLERANCE:
+            ambiguous_count += 1
+            _report_line(ambiguous, line, "amount_mismatch", row)
+        else:
+            matched[candidates[0].id] = candidates[0]
+            matched_lines[candidates[0].id] = (line, row)
+
+    # Khóa lại các hóa đơn khớp và chỉ ghi những hóa đơn vẫn còn UNPAID:
+    # hóa đơn vừa được thanh toán ở request khác không bị cộng doanh thu hai lần
+    paid_at = datetime.utcnow()
+    matched_ids = list(matched)
+    settled = {}
+    for i in range(0, len(matched_ids), RECONCILE_BATCH_SIZE):
+        batch = list(db.execute(
+            select(Invoice.id)
+            .where(
+                Invoice.id.in_(matched_ids[i:i + RECONCILE_BATCH_SIZE]),
+                Invoice.status == InvoiceStatus.UNPAID,
+            )
+            .with_for_update()
+        ).scalars())
+        if not batch:
+            continue
+        db.execute(
+            update(Invoice)
+            .where(Invoice.id.in_(batch))
+            .values(status=InvoiceStatus.PAID, paid_at=paid_at)
+        )
+        settled.update((invoice_id, matched[invoice_id]) for invoice_id in batch)
+
+    for invoice_id in matched_ids:
+        if invoice_id not in settled:
+            ambiguous_count += 1
+            _report_line(ambiguous, *matched_lines[invoice_id][:1], "already_paid", matched_lines[invoice_id][1])
+    matched = settled
+
+    apply_revenue_deltas(
+        db,
+        payment_deltas((r.year, r.month, r.room_id, r.amount) for r in matched.values()),
+    )
+    db.commit()
+
+    return {
+        "message": f"Đã đối soát {len(matched)}/{lines} giao dịch",
+        "lines": lines,
+        "matched": len(matched),
+        "matched_amount": sum(r.amount for r in matched.values()),
+        "unmatched_count": unmatched_count,
+        "ambiguous_count": ambiguous_count,
+        "unmatched": unmatched,
+        "ambiguous": ambiguous,
+    }
+
+
 # ============================
 # Admin revenue statistics
 # ============================
+# Các API thống kê đọc từ bảng tổng hợp invoicerevenue, không quét bảng invoice.
+# Tính lại bảng tổng hợp: python -m services.revenue
+def _revenue_filters(month: int = None, year: int = None):
+    filters = []
+    if month:
+        filters.append(InvoiceRevenue.month == month)
+    if year:
+        filters.append(InvoiceRevenue.year == year)
+    return filters
+
+
+def _paid_amount():
+    return func.coalesce(
+        func.sum(
+            case(
+                (InvoiceRevenue.status == InvoiceStatus.PAID, InvoiceRevenue.total_amount),
+                else_=0,
+            )
+        ),
+        0,
+    )
+
+
 @router.get("/stats")
 def get_invoice_stats(
     month: int = Query(None, description="Tháng cần thống kê"),
@@ -224,24 +579,94 @@ def get_invoice_stats(
     db: Session = Depends(get_db),
     current_user=Depends(admin_required),
 ):
-    query = db.query(Invoice)
+    total_invoices, total_amount, paid_amount = db.execute(
+        select(
+            func.coalesce(func.sum(InvoiceRevenue.invoice_count), 0),
+            func.coalesce(func.sum(InvoiceRevenue.total_amount), 0),
+            _paid_amount(),
+        ).where(*_revenue_filters(month, year))
+    ).one()
 
-    if month:
-        query = query.filter(Invoice.month == month)
-    if year:
-        query = query.filter(Invoice.year == year)
+    return {
+        "month": month,
+        "year": year,
+        "total_invoices": total_invoices,
+        "total_amount": total_amount,
+        "paid_amount": paid_amount,
+        "unpaid_amount": total_amount - paid_amount,
+    }
 
-    invoices = query.all()
 
-    total_amount = sum(inv.amount for inv in invoices)
-    paid_amount = sum(inv.amount for inv in invoices if inv.status == "PAID")
-    unpaid_amount = total_amount - paid_amount
+@router.get("/stats/yearly")
+def get_invoice_stats_yearly(
+    month: int = Query(None, description="Chỉ so sánh tháng này giữa các năm"),
+    db: Session = Depends(get_db),
+    current_user=Depends(admin_required),
+):
+    rows = db.execute(
+        select(
+            InvoiceRevenue.year,
+            func.sum(InvoiceRevenue.invoice_count),
+            func.sum(InvoiceRevenue.total_amount),
+            _paid_amount(),
+        )
+        .where(*_revenue_filters(month))
+        .group_by(InvoiceRevenue.year)
+        .order_by(InvoiceRevenue.year)
+    ).all()
+
+    years = []
+    previous_total = None
+    for year, total_invoices, total_amount, paid_amount in rows:
+        growth = None
+        if previous_total:
+            growth = round((total_amount - previous_total) / previous_total * 100, 2)
+        years.append({
+            "year": year,
+            "total_invoices": total_invoices,
+            "total_amount": total_amount,
+            "paid_amount": paid_amount,
+            "unpaid_amount": total_amount - paid_amount,
+            "growth_percent": growth,
+        })
+        previous_total = total_amount
+
+    return {"month": month, "years": years}
+
+
+@router.get("/stats/rooms")
+def get_invoice_stats_by_room(
+    month: int = Query(None, description="Tháng cần thống kê"),
+    year: int = Query(None, description="Năm cần thống kê"),
+    db: Session = Depends(get_db),
+    current_user=Depends(admin_required),
+):
+    rows = db.execute(
+        select(
+            InvoiceRevenue.room_id,
+            Room.room_code,
+            func.sum(InvoiceRevenue.invoice_count),
+            func.sum(InvoiceRevenue.total_amount),
+            _paid_amount(),
+        )
+        .outerjoin(Room, InvoiceRevenue.room_id == Room.id)
+        .where(*_revenue_filters(month, year))
+        .group_by(InvoiceRevenue.room_id, Room.room_code)
+        .order_by(InvoiceRevenue.room_id)
+    ).all()
 
     return {
         "month": month,
         "year": year,
-        "total_invoices": len(invoices),
-        "total_amount": total_amount,
-        "paid_amount": paid_amount,
-        "unpaid_amount": unpaid_amount,
+        "rooms": [
+            {
+                "room_id": room_id,
+                "room_code": room_code,
+                "total_invoices": total_invoices,
+                "total_amount": total_amount,
+                "paid_amount": paid_amount,
+                "unpaid_amount": total_amount - paid_amount,
+            }
+            for room_id, room_code, total_invoices, total_amount, paid_amount in rows
+        ],
     }
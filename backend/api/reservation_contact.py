@@ -1,20 +1,33 @@
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Body, Query
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, case, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from calendar import monthrange
 from datetime import date, datetime, timedelta
 
-from database.init_db import get_db
+from database.init_db import SessionLocal, get_async_db, get_db
 from models.students import Student
 from models.reservation import Reservation
 from models.account import Account
+from schemas.token import TokenData
 from models.room import Room
 from models.contract import Contract
-from services.auth import get_current_user, admin_required
+from models.room_transfer import RoomTransfer
+from services.auth import get_current_user, get_current_user_async, admin_required
+from services.availability import availability_index
+from services.occupancy import reserve_seat
+from services.room_transfer import transfer_contract
+from services.waitlist import is_full_for_booking, promote_waitlist, waitlist_position
+from services.room_assignment import assign_rooms, load_assignment_input
 from helpers.reservation_status import ReservationStatus
 from helpers.contract_status import ContractStatus
-from schemas.reservation import ReservationCreate
-from schemas.contract import ContractExtendRequest
+from helpers.transfer_status import TransferStatus
+from schemas.reservation import ChangeRoomRequest, ReservationBulkStatusRequest, ReservationCreate
+from schemas.contract import ContractBulkExtendRequest, ContractExtendRequest
+from helpers.cursor import decode_cursor, encode_cursor
+from helpers.export import export_response
 
 
 # ----------------- Router chính -----------------
@@ -28,57 +41,89 @@ def get_first_day_of_next_month(d: date) -> date:
     return date(year, month, 1)
 
 
+def get_contract_period(d: date):
+    """Hợp đồng bắt đầu từ ngày 01 tháng kế tiếp, thời hạn 12 tháng"""
+    start_date = get_first_day_of_next_month(d)
+    end_date = date(
+        start_date.year + (start_date.month + 11) // 12,
+        (start_date.month + 11) % 12 + 1,
+        1
+    )
+    return start_date, end_date
+
+
+def add_months(d: datetime, months: int) -> datetime:
+    """Cộng thêm số tháng, ngày vượt quá cuối tháng được đưa về ngày cuối tháng"""
+    month_index = d.month - 1 + months
+    year = d.year + month_index // 12
+    month = month_index % 12 + 1
+    return d.replace(year=year, month=month, day=min(d.day, monthrange(year, month)[1]))
+
+
 # ----------------- API Sinh viên -----------------
 student_router = APIRouter(prefix="/student", tags=["Student Reservation"])
 
 @student_router.post("/reservations/")
-def create_reservation(
+async def create_reservation(
     data: ReservationCreate,
-    db: Session = Depends(get_db),
-    current_user: Account = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Account = Depends(get_current_user_async)
 ):
-    student = db.query(Student).filter(Student.account_id == current_user.id).first()
+    student = (await db.execute(
+        select(Student).where(Student.account_id == current_user.id)
+    )).scalars().first()
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    room = db.query(Room).filter(Room.id == data.room_id).first()
+    # Khóa dòng phòng tới khi commit: hai request cùng tranh suất cuối được xét lần lượt
+    room = (await db.execute(
+        select(Room).where(Room.id == data.room_id).with_for_update()
+    )).scalar_one_or_none()
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
 
-    # check full
-    approved_count = db.query(Reservation).filter(
-        Reservation.room_id == room.id,
-        Reservation.status == ReservationStatus.APPROVED
-    ).count()
-    if approved_count >= room.capacity:
-        raise HTTPException(status_code=400, detail="Room is full")
-
     # check student đã có booking chưa
-    existing_res = db.query(Reservation).filter(
-        Reservation.student_id == student.id,
-        Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.APPROVED])
-    ).first()
+    existing_res = (await db.execute(
+        select(Reservation.id).where(
+            Reservation.student_id == student.id,
+            Reservation.status.in_([
+                ReservationStatus.PENDING,
+                ReservationStatus.APPROVED,
+                ReservationStatus.WAITLISTED,
+            ])
+        ).limit(1)
+    )).first()
     if existing_res:
         raise HTTPException(status_code=400, detail="Student already has a reservation")
 
+    # Phòng hết suất thì vào hàng chờ (FIFO theo thứ tự tạo)
+    # Các helper sync trong services/ chạy qua run_sync trên cùng kết nối async
+    waitlisted = await db.run_sync(lambda session: is_full_for_booking(session, room))
     new_res = Reservation(
         student_id=student.id,
         room_id=data.room_id,
         booking_date=data.booking_date,
+        status=ReservationStatus.WAITLISTED if waitlisted else ReservationStatus.PENDING,
     )
     db.add(new_res)
-    db.commit()
-    db.refresh(new_res)
+    await db.commit()
+    await db.refresh(new_res)
 
-    return JSONResponse({
-        "message": "Reservation created successfully",
+    response = {
+        "message": "Room is full, reservation added to waitlist" if waitlisted
+        else "Reservation created successfully",
         "data": {
             "reservation_id": new_res.id,
             "room_id": new_res.room_id,
             "start_date": str(new_res.start_date),
             "status": new_res.status.value
         }
-    })
+    }
+    if waitlisted:
+        response["data"]["waitlist_position"] = await db.run_sync(
+            lambda session: waitlist_position(session, new_res)
+        )
+    return JSONResponse(response)
 
 @student_router.get("/contracts")
 def get_my_contracts(
@@ -114,6 +159,62 @@ def get_my_contracts(
         ]
     })
     
+@student_router.post("/contracts/{contract_id}/change-room")
+def request_room_change(
+    contract_id: int,
+    data: ChangeRoomRequest,
+    db: Session = Depends(get_db),
+    current_user: Account = Depends(get_current_user)
+):
+    student = db.query(Student).filter(Student.account_id == current_user.id).first()
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    contract = db.execute(
+        select(Contract.id, Contract.status, Reservation.room_id)
+        .join(Reservation, Contract.reservation_id == Reservation.id)
+        .where(Contract.id == contract_id, Reservation.student_id == student.id)
+    ).first()
+    if not contract:
+        raise HTTPException(status_code=404, detail="Contract not found")
+    if contract.status != ContractStatus.ACTIVE:
+        raise HTTPException(status_code=400, detail="Only active contracts can be transferred")
+    if contract.room_id == data.new_room_id:
+        raise HTTPException(status_code=400, detail="Contract is already in this room")
+
+    room = db.query(Room).filter(Room.id == data.new_room_id, Room.active == True).first()
+    if not room:
+        raise HTTPException(status_code=404, detail="Room not found")
+
+    existing = db.query(RoomTransfer).filter(
+        RoomTransfer.contract_id == contract_id,
+        RoomTransfer.status == TransferStatus.PENDING
+    ).first()
+    if existing:
+        raise HTTPException(status_code=400, detail="A room change request is already pending")
+
+    transfer = RoomTransfer(
+        contract_id=contract_id,
+        from_room_id=contract.room_id,
+        to_room_id=data.new_room_id,
+        status=TransferStatus.PENDING,
+    )
+    db.add(transfer)
+    db.commit()
+    db.refresh(transfer)
+
+    return JSONResponse({
+        "message": "Room change request created successfully",
+        "data": {
+            "transfer_id": transfer.id,
+            "contract_id": transfer.contract_id,
+            "from_room_id": transfer.from_room_id,
+            "to_room_id": transfer.to_room_id,
+            "status": transfer.status.value
+        }
+    })
+
+
 @student_router.delete("/booking/{reservation_id}/cancel")
 def cancel_reservation(
     reservation_id: int,
@@ -131,13 +232,18 @@ def cancel_reservation(
     if not reservation:
         raise HTTPException(status_code=404, detail="Booking not found")
 
-    if reservation.status != ReservationStatus.PENDING:
+    if reservation.status not in (ReservationStatus.PENDING, ReservationStatus.WAITLISTED):
         raise HTTPException(
             status_code=400,
             detail="Booking cannot be canceled because it is already approved or rejected"
         )
 
+    frees_seat = reservation.status == ReservationStatus.PENDING
+    room_id = reservation.room_id
     db.delete(reservation)
+    if frees_seat:
+        db.flush()
+        promote_waitlist(db, [room_id])
     db.commit()
 
     return JSONResponse({"message": "Booking canceled successfully"})
@@ -178,11 +284,34 @@ def get_reservations(
 # ----------------- API Admin -----------------
 admin_router = APIRouter(prefix="/admin", tags=["Admin Reservation & Contract"])
 
+@admin_router.get("/waitlist")
+def get_waitlist_depth(
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(admin_required),
+):
+    """Số reservation đang chờ trong hàng đợi của từng phòng"""
+    rows = db.execute(
+        select(Reservation.room_id, Room.room_code, func.count(Reservation.id))
+        .join(Room, Reservation.room_id == Room.id)
+        .where(Reservation.status == ReservationStatus.WAITLISTED)
+        .group_by(Reservation.room_id, Room.room_code)
+        .order_by(func.count(Reservation.id).desc())
+    ).all()
+
+    return JSONResponse({
+        "count": len(rows),
+        "data": [
+            {"room_id": room_id, "room_code": room_code, "waitlisted": depth}
+            for room_id, room_code, depth in rows
+        ]
+    })
+
+
 @admin_router.get("/contract/{contract_id}")
 def get_contract_detail(
     contract_id: int,
     db: Session = Depends(get_db),
-    current_user: Account = Depends(admin_required),
+    current_user: TokenData = Depends(admin_required),
 ):
     contract = (
         db.query(Contract)
@@ -209,33 +338,103 @@ def get_contract_detail(
     })
 
 
+# Các cột được phép sắp xếp; created_at là tên cũ của booking_date
+RESERVATION_SORT_COLUMNS = {
+    "booking_date": Reservation.booking_date,
+    "created_at": Reservation.booking_date,
+    "start_date": Reservation.start_date,
+}
+
+
 @admin_router.get("/reservations")
 def list_reservations(
-    status: Optional[str] = None,
+    status: Optional[ReservationStatus] = None,
     room_id: Optional[int] = None,
     student_id: Optional[int] = None,
-    sort_by: str = "created_at",
-    order: str = "asc",
+    sort_by: str = Query("created_at", pattern="^(booking_date|created_at|start_date)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor của trang trước"),
     db: Session = Depends(get_db),
-    current_user: Account = Depends(admin_required),
+    current_user: TokenData = Depends(admin_required),
 ):
-    query = db.query(Reservation).options(joinedload(Reservation.student))
+    """
+    Danh sách reservation phân trang keyset theo (sort key, id).
+    start_date có thể NULL (pending, waitlisted, rejected): dòng NULL xếp sau cùng
+    khi asc, đầu tiên khi desc; cursor lưu null cho các dòng này.
+    """
+    sort_column = RESERVATION_SORT_COLUMNS[sort_by]
+    query = (
+        select(
+            Reservation.id,
+            Reservation.status,
+            Reservation.room_id,
+            Reservation.booking_date,
+            Reservation.start_date,
+            Student.id.label("student_id"),
+            Student.full_name,
+            Student.birth,
+            Student.gender,
+            Student.phone,
+            Student.email,
+        )
+        .join(Student, Reservation.student_id == Student.id)
+    )
 
     if status:
-        query = query.filter(Reservation.status == status)
+        query = query.where(Reservation.status == status)
     if room_id:
-        query = query.filter(Reservation.room_id == room_id)
+        query = query.where(Reservation.room_id == room_id)
     if student_id:
-        query = query.filter(Reservation.student_id == student_id)
-
-    order_by = Reservation.start_date if sort_by == "start_date" else Reservation.booking_date
+        query = query.where(Reservation.student_id == student_id)
+    nullable = sort_by == "start_date"
+    # Khóa sắp xếp null-safe: (sort key IS NULL, sort key, id); MySQL không có NULLS LAST
+    is_null = case((sort_column.is_(None), 1), else_=0)
+
+    if cursor:
+        parse_value = date.fromisoformat if nullable else datetime.fromisoformat
+        last_value, last_id = decode_cursor(
+            cursor, 2, (lambda v: None if v is None and nullable else parse_value(v), int)
+        )
+        if last_value is None:
+            # Trang trước dừng ở nhóm NULL: asc chỉ còn dòng NULL; desc còn thêm mọi dòng có giá trị
+            after_id = Reservation.id < last_id if order == "desc" else Reservation.id > last_id
+            rest = and_(sort_column.is_(None), after_id)
+            query = query.where(or_(sort_column.isnot(None), rest) if order == "desc" else rest)
+        else:
+            if order == "desc":
+                after = or_(
+                    sort_column < last_value,
+                    and_(sort_column == last_value, Reservation.id < last_id),
+                )
+            else:
+                after = or_(
+                    sort_column > last_value,
+                    and_(sort_column == last_value, Reservation.id > last_id),
+                )
+                if nullable:
+                    after = or_(after, sort_column.is_(None))
+            query = query.where(after)
+
+    order_by = [is_null, sort_column, Reservation.id] if nullable else [sort_column, Reservation.id]
     if order == "desc":
-        order_by = order_by.desc()
+        query = query.order_by(*[column.desc() for column in order_by])
+    else:
+        query = query.order_by(*order_by)
+
+    rows = db.execute(query.limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
-    reservations = query.order_by(order_by).all()
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        last_value = last.start_date if nullable else last.booking_date
+        next_cursor = encode_cursor([last_value.isoformat() if last_value else None, last.id])
 
     return JSONResponse({
-        "count": len(reservations),
+        "count": len(rows),
+        "next_cursor": next_cursor,
         "data": [
             {
                 "reservation_id": r.id,
@@ -244,15 +443,15 @@ def list_reservations(
                 "created_at": str(r.booking_date),
                 "start_date": str(r.start_date) if r.start_date else None,
                 "student": {
-                    "id": r.student.id,
-                    "name": r.student.full_name,
-                    "birth": str(r.student.birth),
-                    "gender": r.student.gender,
-                    "phone": r.student.phone,
-                    "email": r.student.email,
+                    "id": r.student_id,
+                    "name": r.full_name,
+                    "birth": str(r.birth),
+                    "gender": r.gender,
+                    "phone": r.phone,
+                    "email": r.email,
                 }
             }
-            for r in reservations
+            for r in rows
         ]
     })
 
@@ -262,12 +461,17 @@ def update_reservation_status(
     reservation_id: int,
     new_status: str = Body(..., embed=True),
     db: Session = Depends(get_db),
-    current_user: Account = Depends(admin_required),
+    current_user: TokenData = Depends(admin_required),
 ):
     if new_status not in [ReservationStatus.APPROVED, ReservationStatus.REJECTED]:
         raise HTTPException(status_code=400, detail="Invalid status value")
 
-    reservation = db.query(Reservation).filter(Reservation.id == reservation_id).first()
+    reservation = (
+        db.query(Reservation)
+        .filter(Reservation.id == reservation_id)
+        .with_for_update()
+        .first()
+    )
     if not reservation:
         raise HTTPException(status_code=404, detail="Reservation not found")
 
@@ -279,24 +483,15 @@ def update_reservation_status(
         raise HTTPException(status_code=404, detail="Room not found")
 
     if new_status == ReservationStatus.APPROVED:
-        approved_count = db.query(Reservation).filter(
-            Reservation.room_id == room.id,
-            Reservation.status == ReservationStatus.APPROVED
-        ).count()
-        if approved_count >= room.capacity:
+        if not reserve_seat(db, room.id):
+            db.rollback()
             raise HTTPException(status_code=400, detail="Room is already full")
 
-        today = date.today()
-        start_date = get_first_day_of_next_month(today)
+        start_date, end_date = get_contract_period(date.today())
 
         reservation.status = ReservationStatus.APPROVED
         reservation.start_date = start_date
 
-        end_date = date(
-            start_date.year + (start_date.month + 11) // 12,
-            (start_date.month + 11) % 12 + 1,
-            1
-        )
         new_contract = Contract(
             reservation_id=reservation.id,
             start_date=start_date,
@@ -307,9 +502,13 @@ def update_reservation_status(
     else:
         reservation.status = ReservationStatus.REJECTED
         reservation.start_date = None
+        db.flush()
+        promote_waitlist(db, [room.id])
 
     db.commit()
     db.refresh(reservation)
+    if new_status == ReservationStatus.APPROVED:
+        availability_index.refresh_rooms(db, [room.id])
 
     return JSONResponse({
         "message": f"Reservation {new_status} successfully",
@@ -321,12 +520,191 @@ def update_reservation_status(
     })
 
 
+@admin_router.put("/reservations/bulk-status")
+def bulk_update_reservation_status(
+    data: ReservationBulkStatusRequest,
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(admin_required),
+):
+    """
+    Duyệt / từ chối hàng loạt reservation.
+    - Xử lý theo thứ tự booking_date, mỗi phòng được lấp đến khi đủ capacity
+      (đếm bằng một tally trong bộ nhớ cho mỗi phòng).
+    - Toàn bộ Contract được insert trong một lần, cả lô nằm trong một transaction.
+    """
+    query = select(Reservation.id, Reservation.room_id, Reservation.status)
+    if data.reservation_ids:
+        query = query.where(Reservation.id.in_(data.reservation_ids))
+    else:
+        query = query.where(Reservation.status == ReservationStatus.PENDING)
+    if data.room_id:
+        query = query.where(Reservation.room_id == data.room_id)
+    if data.booked_from:
+        query = query.where(Reservation.booking_date >= data.booked_from)
+    if data.booked_to:
+        query = query.where(Reservation.booking_date < data.booked_to + timedelta(days=1))
+
+    reservations = db.execute(
+        query.order_by(Reservation.booking_date, Reservation.id).with_for_update()
+    ).all()
+
+    outcomes = {}
+    if data.reservation_ids:
+        found = {r.id for r in reservations}
+        for reservation_id in data.reservation_ids:
+            if reservation_id not in found:
+                outcomes[reservation_id] = "not_found"
+
+    pending = []
+    for r in reservations:
+        if r.status != ReservationStatus.PENDING:
+            outcomes[r.id] = "already_processed"
+        else:
+            pending.append(r)
+
+    if data.new_status == ReservationStatus.APPROVED:
+        approvals = {}
+        free_seats = {
+            room.id: room.capacity - room.current_occupancy
+            for room in db.execute(
+                select(Room.id, Room.capacity, Room.current_occupancy)
+                .where(Room.id.in_({r.room_id for r in pending}))
+                .with_for_update()
+            )
+        }
+        for r in pending:
+            if free_seats.get(r.room_id, 0) > 0:
+                free_seats[r.room_id] -= 1
+                approvals.setdefault(r.room_id, []).append(r.id)
+                outcomes[r.id] = "approved"
+            else:
+                outcomes[r.id] = "room_full"
+
+        if not _approve_reservations(db, approvals):
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Room occupancy changed, please retry")
+    elif pending:
+        db.execute(
+            update(Reservation),
+            [
+                {"id": r.id, "status": ReservationStatus.REJECTED, "start_date": None}
+                for r in pending
+            ],
+        )
+        for r in pending:
+            outcomes[r.id] = "rejected"
+        promote_waitlist(db, {r.room_id for r in pending})
+
+    db.commit()
+    if data.new_status == ReservationStatus.APPROVED:
+        availability_index.refresh_rooms(db, approvals)
+
+    processed = sum(1 for o in outcomes.values() if o in ("approved", "rejected"))
+    return JSONResponse({
+        "message": f"Processed {processed}/{len(outcomes)} reservations",
+        "data": [
+            {"reservation_id": reservation_id, "result": result}
+            for reservation_id, result in outcomes.items()
+        ]
+    })
+
+
+@admin_router.post("/reservations/auto-assign")
+def auto_assign_reservations(
+    dry_run: bool = Query(True, description="Chỉ xem trước kết quả, không lưu"),
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(admin_required),
+):
+    """
+    Tự động xếp phòng cho toàn bộ reservation PENDING:
+    giữ đúng capacity, không ở ghép khác giới tính, ưu tiên phòng đã chọn
+    và theo thứ tự booking_date. dry_run=false thì duyệt luôn trong một transaction.
+    """
+    requests, rooms = load_assignment_input(db, lock=not dry_run)
+    assignments = assign_rooms(requests, rooms)
+
+    if not dry_run:
+        moved = [
+            a for a in assignments
+            if a.room_id is not None and a.room_id != a.requested_room_id
+        ]
+        if moved:
+            db.execute(update(Reservation), [{"id": a.reservation_id, "room_id": a.room_id} for a in moved])
+
+        approvals = {}
+        for a in assignments:
+            if a.room_id is not None:
+                approvals.setdefault(a.room_id, []).append(a.reservation_id)
+        if not _approve_reservations(db, approvals):
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Room occupancy changed, please retry")
+        # Reservation bị xếp sang phòng khác trả lại suất chờ duyệt ở phòng đã chọn
+        promote_waitlist(db, {a.requested_room_id for a in moved})
+        db.commit()
+        availability_index.refresh_rooms(db, approvals)
+
+    assigned = sum(1 for a in assignments if a.room_id is not None)
+    return JSONResponse({
+        "dry_run": dry_run,
+        "pending": len(assignments),
+        "assigned": assigned,
+        "unassigned": len(assignments) - assigned,
+        "data": [
+            {
+                "reservation_id": a.reservation_id,
+                "student_id": a.student_id,
+                "requested_room_id": a.requested_room_id,
+                "assigned_room_id": a.room_id,
+                "result": a.reason,
+            }
+            for a in assignments
+        ]
+    })
+
+
+def _approve_reservations(db: Session, approvals: dict) -> bool:
+    """
+    approvals: room_id -> danh sách reservation_id cần duyệt vào phòng đó.
+    Giữ chỗ theo từng phòng bằng UPDATE có điều kiện, cập nhật reservation và
+    insert Contract theo lô. Không commit; trả về False nếu phòng không còn đủ chỗ.
+    """
+    for room_id, reservation_ids in approvals.items():
+        if not reserve_seat(db, room_id, len(reservation_ids)):
+            return False
+
+    reservation_ids = [rid for ids in approvals.values() for rid in ids]
+    if not reservation_ids:
+        return True
+
+    start_date, end_date = get_contract_period(date.today())
+    db.execute(
+        update(Reservation),
+        [
+            {"id": rid, "status": ReservationStatus.APPROVED, "start_date": start_date}
+            for rid in reservation_ids
+        ],
+    )
+    db.execute(
+        insert(Contract),
+        [
+            {
+                "reservation_id": rid,
+                "start_date": start_date,
+                "end_date": end_date,
+                "status": ContractStatus.ACTIVE,
+            }
+            for rid in reservation_ids
+        ],
+    )
+    return True
+
+
 @admin_router.put("/contract/{contract_id}/extend")
 def extend_contract(
     contract_id: int,
     data: ContractExtendRequest,
     db: Session = Depends(get_db),
-    current_user: Account = Depends(admin_required),
+    current_user: TokenData = Depends(admin_required),
 ):
     contract = db.query(Contract).filter(Contract.id == contract_id).first()
     if not contract:
@@ -342,6 +720,7 @@ def extend_contract(
     contract.end_date = data.new_end_date
     db.commit()
     db.refresh(contract)
+    availability_index.refresh_rooms(db, [contract.reservation.room_id])
 
     return JSONResponse({
         "message": "Contract extended successfully",
@@ -354,11 +733,176 @@ def extend_contract(
     })
 
 
+@admin_router.put("/contracts/extend/bulk")
+def bulk_extend_contracts(
+    data: ContractBulkExtendRequest,
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(admin_required),
+):
+    """
+    Gia hạn hàng loạt hợp đồng theo bộ lọc (contract_ids, room_ids, expiring_before).
+    Kiểm tra toàn bộ bằng một query, cập nhật bằng một lệnh UPDATE
+    (executemany theo khóa chính khi dùng extend_months).
+    """
+    query = (
+        select(Contract.id, Contract.end_date, Contract.status, Reservation.room_id)
+        .join(Reservation, Contract.reservation_id == Reservation.id)
+    )
+    if data.contract_ids:
+        query = query.where(Contract.id.in_(data.contract_ids))
+    else:
+        query = query.where(Contract.status == ContractStatus.ACTIVE)
+    if data.room_ids:
+        query = query.where(Reservation.room_id.in_(data.room_ids))
+    if data.expiring_before:
+        query = query.where(Contract.end_date < data.expiring_before)
+
+    contracts = db.execute(query.order_by(Contract.id).with_for_update(of=Contract)).all()
+
+    rejected = []
+    if data.contract_ids:
+        found = {c.id for c in contracts}
+        rejected = [
+            {"contract_id": contract_id, "reason": "not_found"}
+            for contract_id in dict.fromkeys(data.contract_ids)
+            if contract_id not in found
+        ]
+
+    renewed = []
+    for c in contracts:
+        new_end_date = data.new_end_date or add_months(c.end_date, data.extend_months)
+        if c.status != ContractStatus.ACTIVE:
+            rejected.append({"contract_id": c.id, "reason": "not_active"})
+        elif new_end_date <= c.end_date:
+            rejected.append({"contract_id": c.id, "reason": "end_date_not_after_current"})
+        else:
+            renewed.append({
+                "contract_id": c.id,
+                "room_id": c.room_id,
+                "old_end_date": c.end_date,
+                "new_end_date": new_end_date,
+            })
+
+    if renewed:
+        if data.new_end_date:
+            db.execute(
+                update(Contract)
+                .where(Contract.id.in_([r["contract_id"] for r in renewed]))
+                .values(end_date=data.new_end_date)
+            )
+        else:
+            db.execute(
+                update(Contract),
+                [{"id": r["contract_id"], "end_date": r["new_end_date"]} for r in renewed],
+            )
+    db.commit()
+    availability_index.refresh_rooms(db, {r["room_id"] for r in renewed})
+
+    return JSONResponse({
+        "message": f"Extended {len(renewed)} contracts, rejected {len(rejected)}",
+        "renewed": [
+            {
+                "contract_id": r["contract_id"],
+                "old_end_date": str(r["old_end_date"]),
+                "new_end_date": str(r["new_end_date"]),
+            }
+            for r in renewed
+        ],
+        "rejected": rejected,
+    })
+
+
+@admin_router.get("/transfers")
+def list_room_transfers(
+    status: Optional[TransferStatus] = Query(TransferStatus.PENDING, description="Lọc theo trạng thái"),
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(admin_required),
+):
+    transfers = (
+        db.query(RoomTransfer)
+        .filter(RoomTransfer.status == status)
+        .order_by(RoomTransfer.id)
+        .all()
+    )
+    return JSONResponse({
+        "count": len(transfers),
+        "data": [
+            {
+                "transfer_id": t.id,
+                "contract_id": t.contract_id,
+                "from_room_id": t.from_room_id,
+                "to_room_id": t.to_room_id,
+                "status": t.status.value,
+                "requested_at": str(t.requested_at),
+            }
+            for t in transfers
+        ]
+    })
+
+
+@admin_router.put("/transfers/{transfer_id}/status")
+def update_room_transfer_status(
+    transfer_id: int,
+    new_status: TransferStatus = Body(..., embed=True),
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(admin_required),
+):
+    if new_status == TransferStatus.PENDING:
+        raise HTTPException(status_code=400, detail="Invalid status value")
+
+    transfer = (
+        db.query(RoomTransfer)
+        .filter(RoomTransfer.id == transfer_id)
+        .with_for_update()
+        .first()
+    )
+    if not transfer:
+        raise HTTPException(status_code=404, detail="Transfer not found")
+    if transfer.status != TransferStatus.PENDING:
+        raise HTTPException(status_code=400, detail="Transfer already processed")
+
+    result = None
+    if new_status == TransferStatus.COMPLETED:
+        result = transfer_contract(db, transfer.contract_id, transfer.to_room_id)
+    transfer.status = new_status
+    transfer.processed_at = datetime.utcnow()
+    db.commit()
+    if result:
+        availability_index.refresh_rooms(db, [result["from_room_id"], result["to_room_id"]])
+
+    return JSONResponse({
+        "message": f"Transfer {new_status.value} successfully",
+        "data": {"transfer_id": transfer_id, "status": new_status.value, "transfer": result}
+    })
+
+
+@admin_router.post("/contract/{contract_id}/change-room")
+def change_contract_room(
+    contract_id: int,
+    data: ChangeRoomRequest,
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(admin_required),
+):
+    """Admin chuyển phòng trực tiếp, không cần yêu cầu từ sinh viên"""
+    result = transfer_contract(db, contract_id, data.new_room_id)
+    db.add(RoomTransfer(
+        contract_id=contract_id,
+        from_room_id=result["from_room_id"],
+        to_room_id=result["to_room_id"],
+        status=TransferStatus.COMPLETED,
+        processed_at=datetime.utcnow(),
+    ))
+    db.commit()
+    availability_index.refresh_rooms(db, [result["from_room_id"], result["to_room_id"]])
+
+    return JSONResponse({"message": "Room changed successfully", "data": result})
+
+
 @admin_router.get("/contracts/expiring-soon")
 def get_expiring_contracts(
     days: int = Query(30, ge=1, le=365, description="Số ngày sắp hết hạn, mặc định 30"),
     db: Session = Depends(get_db),
-    current_user: Account = Depends(admin_required),
+    current_user: TokenData = Depends(admin_required),
 ):
     today = datetime.utcnow().date()
     deadline = today + timedelta(days=days)
@@ -397,6 +941,48 @@ def get_expiring_contracts(
     })
 
 
+@admin_router.get("/contracts/export")
+def export_contracts(
+    status: Optional[ContractStatus] = Query(None, description="Lọc theo trạng thái"),
+    end_before: Optional[date] = Query(None, description="Hết hạn trước ngày"),
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="csv hoặc ndjson"),
+    gzip: bool = Query(False, description="Nén gzip"),
+    current_user: TokenData = Depends(admin_required),
+):
+    query = (
+        select(
+            Contract.id,
+            Contract.reservation_id,
+            Reservation.room_id,
+            Student.id,
+            Student.full_name,
+            Student.email,
+            Student.phone,
+            Contract.start_date,
+            Contract.end_date,
+            Contract.status,
+        )
+        .join(Reservation, Contract.reservation_id == Reservation.id)
+        .join(Student, Reservation.student_id == Student.id)
+    )
+    if status:
+        query = query.where(Contract.status == status)
+    if end_before:
+        query = query.where(Contract.end_date < end_before)
+
+    return export_response(
+        SessionLocal,
+        query.order_by(Contract.id),
+        columns=[
+            "contract_id", "reservation_id", "room_id", "student_id", "student_name",
+            "student_email", "student_phone", "start_date", "end_date", "status",
+        ],
+        filename="contracts",
+        fmt=format,
+        gzip=gzip,
+    )
+
+
 # ----------------- Gắn router con vào router chính -----------------
 router.include_router(student_router)
 router.include_router(admin_router)
@@ -1,27 +1,222 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import codecs
+import csv
+import hashlib
+from datetime import date
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Body, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from pydantic import ValidationError
+from sqlalchemy import and_, case, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database.init_db import get_db
+from core.config import settings
+from database.init_db import get_async_db, get_db
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 
 from schemas.room import RoomCreate, RoomUpdate
+from models.contract import Contract
+from models.reservation import Reservation
 from models.room import Room
 from models.account import Account
+from schemas.token import TokenData
+from helpers.contract_status import ContractStatus
+from helpers.cursor import decode_cursor, encode_cursor
+from helpers.gender_enum import GenderEnum
+from helpers.reservation_status import ReservationStatus
 from services.auth import admin_required
+from services.availability import availability_index
+from services.cache import cache
 
 router = APIRouter(
     prefix="/rooms",
     tags=["Room"]
 )
 
+# ----------------- Cache danh sách phòng -----------------
+# Key dữ liệu gắn với version; admin sửa phòng thì tăng version để bỏ cache cũ
+ROOM_LIST_VERSION_KEY = "rooms:list:version"
+
+
+def invalidate_room_list() -> None:
+    cache.bump_version(ROOM_LIST_VERSION_KEY)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _cached_room_list():
+    key = f"rooms:list:{cache.get_version(ROOM_LIST_VERSION_KEY)}"
+    return key, cache.get(key)
+
+
 @router.get("/")
-def get_rooms(db: Session = Depends(get_db)):
-    rooms = db.query(Room).filter(Room.active == True).all()
-    
+async def get_rooms(request: Request, db: AsyncSession = Depends(get_async_db)):
+    # Backend cache (Redis) là I/O chặn: chạy trong threadpool, không chặn event loop
+    key, body = await run_in_threadpool(_cached_room_list)
+    if body is None:
+        rooms = (await db.execute(select(Room).where(Room.active == True))).scalars().all()
+        body = JSONResponse(
+            content={
+                "success": True,
+                "message": "Lấy tất cả các phòng thành công",
+                "payload": {
+                    "rooms": [
+                        {
+                            "id": room.id,
+                            "room_code": room.room_code,
+                            "capacity": room.capacity,
+                            "price": room.price,
+                            "active": room.active
+                        }
+                        for room in rooms
+                    ]
+                }
+            }
+        ).body
+        await run_in_threadpool(cache.set, key, body, ttl=settings.ROOM_LIST_CACHE_TTL_SECONDS)
+
+    etag = '"%s"' % hashlib.sha256(body).hexdigest()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(
+        content=body,
+        status_code=status.HTTP_200_OK,
+        media_type="application/json",
+        headers=headers,
+    )
+
+@router.get("/availability")
+def get_room_availability(
+    start_date: date = Query(..., description="Ngày bắt đầu ở"),
+    end_date: date = Query(..., description="Ngày kết thúc ở"),
+    beds: int = Query(1, ge=1, description="Số giường trống tối thiểu"),
+    min_capacity: Optional[int] = Query(None, ge=1),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    gender: Optional[GenderEnum] = Query(None, description="Chỉ lấy phòng không có người khác giới trong khoảng ngày"),
+    db: Session = Depends(get_db),
+):
+    """
+    Các phòng còn giường trống trong suốt khoảng [start_date, end_date].
+    Trả lời từ index trong bộ nhớ; chỉ đọc database khi index đã quá hạn.
+    """
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date phải sau start_date"
+        )
+    if availability_index.is_stale:
+        availability_index.build(db)
+
+    rooms = availability_index.find_available(
+        start_date,
+        end_date,
+        beds=beds,
+        min_capacity=min_capacity,
+        min_price=min_price,
+        max_price=max_price,
+        gender=gender,
+    )
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "success": True,
+            "message": "Lấy danh sách phòng trống thành công",
+            "payload": {
+                "start_date": str(start_date),
+                "end_date": str(end_date),
+                "rooms": rooms
+            }
+        }
+    )
+
+ROOM_SORT_FIELDS = ("price", "capacity", "room_code", "free_beds")
+
+
+@router.get("/search")
+def search_rooms(
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    min_capacity: Optional[int] = Query(None, ge=1),
+    max_capacity: Optional[int] = Query(None, ge=1),
+    min_free_beds: Optional[int] = Query(None, ge=0),
+    active: Optional[bool] = Query(True),
+    room_code: Optional[str] = Query(None, description="Tiền tố mã phòng"),
+    sort_by: str = Query("price", pattern="^(price|capacity|room_code|free_beds)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor của trang trước"),
+    db: Session = Depends(get_db),
+):
+    """
+    Tìm phòng kèm số giường trống, tính bằng một LEFT JOIN / GROUP BY
+    trên các reservation APPROVED còn hợp đồng. Phân trang keyset theo (sort_by, id).
+    """
+    occupied = func.count(case(
+        (or_(Contract.id.is_(None), Contract.status != ContractStatus.INACTIVE), Reservation.id),
+    ))
+    free_beds = (Room.capacity - occupied).label("free_beds")
+    sort_column = {
+        "price": Room.price,
+        "capacity": Room.capacity,
+        "room_code": Room.room_code,
+        "free_beds": free_beds,
+    }[sort_by]
+
+    query = (
+        select(Room.id, Room.room_code, Room.capacity, Room.price, Room.active, free_beds)
+        .outerjoin(Reservation, and_(
+            Reservation.room_id == Room.id,
+            Reservation.status == ReservationStatus.APPROVED,
+        ))
+        .outerjoin(Contract, Contract.reservation_id == Reservation.id)
+        .group_by(Room.id, Room.room_code, Room.capacity, Room.price, Room.active)
+    )
+    if active is not None:
+        query = query.where(Room.active == active)
+    if min_price is not None:
+        query = query.where(Room.price >= min_price)
+    if max_price is not None:
+        query = query.where(Room.price <= max_price)
+    if min_capacity is not None:
+        query = query.where(Room.capacity >= min_capacity)
+    if max_capacity is not None:
+        query = query.where(Room.capacity <= max_capacity)
+    if room_code:
+        query = query.where(Room.room_code.startswith(room_code, autoescape=True))
+    if min_free_beds is not None:
+        query = query.having(free_beds >= min_free_beds)
+
+    if cursor:
+        last_value, last_id = decode_cursor(cursor, 2, (None, int))
+        if order == "desc":
+            after = or_(sort_column < last_value, and_(sort_column == last_value, Room.id < last_id))
+        else:
+            after = or_(sort_column > last_value, and_(sort_column == last_value, Room.id > last_id))
+        query = query.having(after) if sort_by == "free_beds" else query.where(after)
+
+    if order == "desc":
+        query = query.order_by(sort_column.desc(), Room.id.desc())
+    else:
+        query = query.order_by(sort_column, Room.id)
+
+    rows = db.execute(query.limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
             "success": True,
-            "message": "Lấy tất cả các phòng thành công",
+            "message": "Tìm phòng thành công",
             "payload": {
                 "rooms": [
                     {
@@ -29,10 +224,12 @@ def get_rooms(db: Session = Depends(get_db)):
                         "room_code": room.room_code,
                         "capacity": room.capacity,
                         "price": room.price,
-                        "active": room.active
+                        "active": room.active,
+                        "free_beds": room.free_beds
                     }
-                    for room in rooms
-                ]
+                    for room in rows
+                ],
+                "next_cursor": encode_cursor([getattr(rows[-1], sort_by), rows[-1].id]) if has_more else None
             }
         }
     )
@@ -54,17 +251,26 @@ def get_room_id(
 def create_room(
     data: RoomCreate,
     db: Session = Depends(get_db),
-    current_user: Account = Depends(admin_required)
+    current_user: TokenData = Depends(admin_required)
 ):
     new_room = Room(
         room_code=data.room_code,
         capacity=data.capacity,
         price=data.price,
-        active=True
+        active=data.active
     )
     db.add(new_room)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Mã phòng đã tồn tại"
+        )
     db.refresh(new_room)
+    invalidate_room_list()
+    availability_index.refresh_rooms(db, [new_room.id])
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
@@ -82,13 +288,161 @@ def create_room(
         }
     )
   
+# ----------------- Nhập / cập nhật phòng hàng loạt -----------------
+ROOM_IMPORT_BATCH_SIZE = 500
+
+
+def _validation_messages(error: ValidationError):
+    return [
+        f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" if err["loc"] else err["msg"]
+        for err in error.errors()
+    ]
+
+
+def _import_rooms(db: Session, raw_rows: List[Any]) -> dict:
+    """
+    Upsert phòng theo room_code: mã mới thì tạo (RoomCreate), mã đã có thì
+    cập nhật các trường được gửi (RoomUpdate). Dòng lỗi được báo riêng,
+    các dòng hợp lệ vẫn được ghi bằng executemany. Mỗi lô insert chạy trong
+    savepoint: mã phòng bị request khác tạo trước được báo lỗi theo dòng.
+    """
+    errors = []
+    rows = {}
+    for index, raw in enumerate(raw_rows, start=1):
+        if not isinstance(raw, dict):
+            errors.append({"row": index, "errors": ["Dòng phải là object"]})
+            continue
+        # CSV: ô trống coi như không gửi
+        raw = {k: v for k, v in raw.items() if v not in ("", None)}
+        code = str(raw.get("room_code") or "").strip()
+        if not code:
+            errors.append({"row": index, "errors": ["room_code: Field required"]})
+        elif code in rows:
+            errors.append({"row": index, "room_code": code, "errors": ["room_code bị trùng trong file"]})
+        else:
+            raw["room_code"] = code
+            rows[code] = (index, raw)
+
+    existing, duplicated = {}, set()
+    codes = list(rows)
+    for i in range(0, len(codes), ROOM_IMPORT_BATCH_SIZE):
+        for room in db.execute(
+            select(Room.id, Room.room_code, Room.capacity, Room.current_occupancy)
+            .where(Room.room_code.in_(codes[i:i + ROOM_IMPORT_BATCH_SIZE]))
+        ):
+            # DB cũ chưa có unique index trên room_code có thể còn mã trùng
+            if room.room_code in existing:
+                duplicated.add(room.room_code)
+            existing[room.room_code] = room
+
+    inserts, updates = [], []
+    for code, (index, raw) in rows.items():
+        try:
+            if code in duplicated:
+                raise ValueError("room_code đang trùng nhiều phòng trong DB, cần xử lý tay")
+            if code in existing:
+                room = existing[code]
+                # current_occupancy không nhập được: RoomUpdate từ chối trường này
+                values = RoomUpdate(**raw).dict(exclude_unset=True, exclude={"room_code"})
+                if values:
+                    updates.append((index, code, room.id, values))
+            else:
+                inserts.append(RoomCreate(**raw).dict())
+        except ValidationError as e:
+            errors.append({"row": index, "room_code": code, "errors": _validation_messages(e)})
+        except ValueError as e:
+            errors.append({"row": index, "room_code": code, "errors": [str(e)]})
+
+    created = 0
+    for i in range(0, len(inserts), ROOM_IMPORT_BATCH_SIZE):
+        chunk = inserts[i:i + ROOM_IMPORT_BATCH_SIZE]
+        try:
+            with db.begin_nested():
+                db.execute(insert(Room), chunk)
+            created += len(chunk)
+        except IntegrityError:
+            # Request khác vừa tạo cùng room_code: ghi lại từng dòng để báo đúng dòng bị trùng
+            for values in chunk:
+                try:
+                    with db.begin_nested():
+                        db.execute(insert(Room).values(**values))
+                    created += 1
+                except IntegrityError:
+                    errors.append({
+                        "row": rows[values["room_code"]][0],
+                        "room_code": values["room_code"],
+                        "errors": ["room_code vừa được tạo bởi thao tác khác"],
+                    })
+    # Không đổi capacity: executemany theo khóa chính; đổi capacity: so với số người
+    # đang ở ngay trong câu UPDATE như update_room, không đọc rồi ghi
+    batched = [{"id": room_id, **values} for _, _, room_id, values in updates if "capacity" not in values]
+    for i in range(0, len(batched), ROOM_IMPORT_BATCH_SIZE):
+        db.execute(update(Room), batched[i:i + ROOM_IMPORT_BATCH_SIZE])
+    updated = len(batched)
+    for index, code, room_id, values in updates:
+        if "capacity" not in values:
+            continue
+        result = db.execute(
+            update(Room)
+            .where(Room.id == room_id, Room.current_occupancy <= values["capacity"])
+            .values(**values)
+        )
+        if result.rowcount == 1:
+            updated += 1
+        else:
+            errors.append({
+                "row": index,
+                "room_code": code,
+                "errors": ["capacity không được nhỏ hơn số người đang ở"],
+            })
+    db.commit()
+
+    if created or updated:
+        invalidate_room_list()
+        availability_index.build(db)
+
+    return {
+        "success": not errors,
+        "message": f"Tạo {created} phòng, cập nhật {updated} phòng, {len(errors)} dòng lỗi",
+        "payload": {
+            "created": created,
+            "updated": updated,
+            "errors": sorted(errors, key=lambda e: e["row"]),
+        }
+    }
+
+
+@router.post("/bulk")
+def bulk_import_rooms(
+    rows: List[Any] = Body(..., description="Danh sách RoomCreate / RoomUpdate, khóa theo room_code"),
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(admin_required)
+):
+    return JSONResponse(status_code=status.HTTP_200_OK, content=_import_rooms(db, rows))
+
+
+@router.post("/bulk/csv")
+def bulk_import_rooms_csv(
+    file: UploadFile = File(..., description="CSV có header: room_code, capacity, price, active"),
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(admin_required)
+):
+    try:
+        rows = list(csv.DictReader(codecs.iterdecode(file.file, "utf-8-sig")))
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File CSV phải được mã hóa UTF-8"
+        )
+    return JSONResponse(status_code=status.HTTP_200_OK, content=_import_rooms(db, rows))
+
 # Cập nhập phòng 
 @router.put("/{room_id}")
 def update_room(
     room_id: int,
     room_update: RoomUpdate,
     db: Session = Depends(get_db),
-    current_user: Account = Depends(admin_required)
+    current_user: TokenData = Depends(admin_required)
 ):
     room = db.query(Room).filter(Room.id == room_id).first()
     if not room:
@@ -100,11 +454,31 @@ def update_room(
             }
         )
   
-    for field, value in room_update.dict(exclude_unset=True).items():
-        setattr(room, field, value)
+    values = room_update.dict(exclude_unset=True)
+    if values:
+        # So capacity với số người đang ở trong DB ngay trong câu UPDATE (không đọc rồi ghi)
+        conditions = [Room.id == room_id]
+        if "capacity" in values:
+            conditions.append(Room.current_occupancy <= values["capacity"])
+        try:
+            result = db.execute(update(Room).where(*conditions).values(**values))
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Mã phòng đã tồn tại"
+            )
+        if result.rowcount == 0:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="capacity không được nhỏ hơn số người đang ở"
+            )
   
     db.commit()
     db.refresh(room)
+    invalidate_room_list()
+    availability_index.refresh_rooms(db, [room.id])
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
@@ -128,7 +502,7 @@ def update_room_active(
     room_id: int,
     active: bool,
     db: Session = Depends(get_db),
-    current_user: Account = Depends(admin_required)
+    current_user: TokenData = Depends(admin_required)
 ):
     room = db.query(Room).filter(Room.id == room_id).first()
     if not room:
@@ -142,6 +516,8 @@ def update_room_active(
     room.active = active
     db.commit()
     db.refresh(room)
+    invalidate_room_list()
+    availability_index.refresh_rooms(db, [room.id])
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
@@ -1,13 +1,21 @@
 from typing import *
-from fastapi import APIRouter, Depends, status, HTTPException
+import csv
+import io
+
+from fastapi import APIRouter, Depends, File, status, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from database.init_db import get_db
 from models.students import Student
 from models.account import Account
+from helpers.pwd import PasswordPoolBusy, hash_passwords_async
 from schemas.student import StudentUpdate
-from services.auth import get_current_user
+from schemas.token import TokenData
+from services.auth import admin_required, get_current_user
+from services.student_import import insert_students, validate_student_rows
 
 router = APIRouter(
     prefix="/students",
@@ -89,3 +97,58 @@ def update_my_profile(
             }
         }
     )
+
+# ----------------- Admin: nhập sinh viên hàng loạt từ CSV -----------------
+@router.post("/bulk")
+async def bulk_import_students(
+    file: UploadFile = File(..., description="CSV có header: username, password, full_name, birth, gender, phone, email"),
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(admin_required)
+):
+    content = await file.read()
+    try:
+        rows = list(csv.DictReader(io.StringIO(content.decode("utf-8-sig"))))
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File CSV phải được mã hóa UTF-8"
+        )
+
+    plan = await run_in_threadpool(validate_student_rows, db, rows)
+    if not plan.valid:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "success": False,
+                "message": "Không có dòng hợp lệ",
+                "payload": {"created": 0, "errors": plan.errors},
+            }
+        )
+
+    # bcrypt chạy song song trên pool process
+    try:
+        password_hashes = await hash_passwords_async([data.password for data in plan.valid])
+    except PasswordPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Hệ thống đang bận, vui lòng thử lại sau",
+            headers={"Retry-After": "1"},
+        )
+
+    try:
+        created = await run_in_threadpool(insert_students, db, plan.valid, password_hashes)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Dữ liệu vừa bị thay đổi (trùng username / phone / email), vui lòng thử lại",
+        )
+
+    return JSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content={
+            "success": not plan.errors,
+            "message": f"Đã tạo {created} sinh viên, {len(plan.errors)} dòng lỗi",
+            "payload": {"created": created, "errors": plan.errors},
+        }
+    )
@@ -0,0 +1,115 @@
+"""
+So sánh requests/giây giữa route sync (def + Session, chạy trên threadpool)
+và route async (async def + AsyncSession) với cùng số worker uvicorn.
+
+    python -m benchmarks.async_db --workers 1 --concurrency 100 --requests 3000
+    python -m benchmarks.async_db --db-latency-ms 20   # giả lập DB ở xa
+
+Cần cài thêm httpx để bắn request.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from fastapi import Depends, FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database.init_db import get_async_db, get_db
+from models.room import Room
+# Nạp đủ các model có quan hệ với Room để mapper khởi tạo được
+from models import account, contract, invoice, reservation, students  # noqa: F401
+
+# Cùng một query với GET /rooms khi cache trống, bỏ cache để đo đúng đường DB
+app = FastAPI()
+
+# Giả lập độ trễ mạng tới DB ở xa (SQLite cục bộ gần như không có thời gian chờ I/O)
+DB_LATENCY = float(os.environ.get("BENCH_DB_LATENCY_MS", "0")) / 1000
+
+
+def _serialize(rooms):
+    return [{"id": r.id, "room_code": r.room_code, "price": r.price} for r in rooms]
+
+
+@app.get("/sync/rooms")
+def sync_rooms(db: Session = Depends(get_db)):
+    if DB_LATENCY:
+        time.sleep(DB_LATENCY)
+    return _serialize(db.execute(select(Room).where(Room.active == True)).scalars().all())
+
+
+@app.get("/async/rooms")
+async def async_rooms(db: AsyncSession = Depends(get_async_db)):
+    if DB_LATENCY:
+        await asyncio.sleep(DB_LATENCY)
+    return _serialize((await db.execute(select(Room).where(Room.active == True))).scalars().all())
+
+
+async def _fire(url: str, total: int, concurrency: int) -> float:
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        async def one():
+            async with semaphore:
+                response = await client.get(url)
+                response.raise_for_status()
+
+        await one()  # khởi động kết nối / pool
+        started = time.perf_counter()
+        await asyncio.gather(*[one() for _ in range(total)])
+        return total / (time.perf_counter() - started)
+
+
+async def _wait_ready(base_url: str) -> None:
+    import httpx
+
+    async with httpx.AsyncClient() as client:
+        for _ in range(100):
+            try:
+                await client.get(f"{base_url}/docs")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("uvicorn không khởi động được")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db-latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "benchmarks.async_db:app",
+            "--port", str(args.port), "--workers", str(args.workers), "--log-level", "warning",
+        ],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env={**os.environ, "BENCH_DB_LATENCY_MS": str(args.db_latency_ms)},
+    )
+    try:
+        asyncio.run(_wait_ready(base_url))
+        print(
+            f"{args.workers} worker, {args.concurrency} request đồng thời, "
+            f"{args.requests} request, độ trễ DB {args.db_latency_ms} ms"
+        )
+        for path in ("/sync/rooms", "/async/rooms"):
+            rps = asyncio.run(_fire(base_url + path, args.requests, args.concurrency))
+            print(f"{path:<14} {rps:8.1f} req/s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
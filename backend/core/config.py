@@ -1,14 +1,62 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings 
 
 class Settings(BaseSettings):
   DATABASE_URL : str 
+  # Để trống: suy ra từ DATABASE_URL (sqlite -> aiosqlite, mysql -> aiomysql, postgresql -> asyncpg)
+  ASYNC_DATABASE_URL : Optional[str] = None
+  
+  # Connection pool (mỗi engine, mỗi worker). DB_POOL_RECYCLE = -1: không recycle
+  DB_POOL_SIZE : int = 5
+  DB_MAX_OVERFLOW : int = 10
+  DB_POOL_TIMEOUT : int = 30
+  DB_POOL_RECYCLE : int = 1800
+  # Pre-ping: "always" (mỗi lần checkout), "idle" (chỉ khi kết nối rảnh quá DB_PRE_PING_IDLE_SECONDS), "none"
+  DB_PRE_PING : str = "idle"
+  DB_PRE_PING_IDLE_SECONDS : int = 60
   ALGORITHM: str = "HS256"
   ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+  REFRESH_TOKEN_EXPIRE_DAYS: int = 14
   GROQ_API_KEY : str 
   HF_TOKEN : str 
   
   SECRET_KEY : str 
   GROQ_API_KEY : str 
+  
+  # Quét hợp đồng hết hạn (giây, 0 = tắt luồng chạy nền)
+  CONTRACT_SWEEP_INTERVAL_SECONDS : int = 3600
+  CONTRACT_SWEEP_BATCH_SIZE : int = 500
+  
+  # Index phòng trống trong bộ nhớ tự dựng lại sau số giây này
+  AVAILABILITY_INDEX_TTL_SECONDS : int = 300
+  
+  # Cache: "memory" (LRU trong từng worker) hoặc "redis" (dùng chung, cần REDIS_URL)
+  CACHE_BACKEND : str = "memory"
+  REDIS_URL : Optional[str] = None
+  CACHE_MAX_ENTRIES : int = 256
+  ROOM_LIST_CACHE_TTL_SECONDS : int = 300
+  
+  # Cache dòng account cho get_current_user (0 = tắt)
+  ACCOUNT_CACHE_TTL_SECONDS : int = 60
+  ACCOUNT_CACHE_MAX_ENTRIES : int = 1024
+  
+  # bcrypt chạy trên pool process riêng; hàng đợi vượt giới hạn thì trả 503
+  BCRYPT_ROUNDS : int = 12
+  PASSWORD_HASH_WORKERS : int = 2
+  PASSWORD_HASH_MAX_QUEUE : int = 64
+  # Số chunk nhập hàng loạt băm song song (0 = dùng hết PASSWORD_HASH_WORKERS)
+  PASSWORD_HASH_BULK_CONCURRENCY : int = 0
+  
+  # Rate limit dạng token bucket: "số lượng/second|minute|hour", rỗng = không giới hạn
+  RATE_LIMIT_ENABLED : bool = True
+  RATE_LIMIT_BACKEND : str = "memory"
+  RATE_LIMIT_MAX_KEYS : int = 10000
+  RATE_LIMIT_TRUST_FORWARDED : bool = False
+  RATE_LIMIT_LOGIN_PER_IP : str = "20/minute"
+  RATE_LIMIT_LOGIN_PER_ACCOUNT : str = "5/minute"
+  RATE_LIMIT_CHATBOT_PER_IP : str = "30/minute"
+  RATE_LIMIT_CHATBOT_PER_ACCOUNT : str = "10/minute"
   class Config : 
     env_file = ".env"
     
@@ -1,12 +1,18 @@
 from typing import * 
 
 from sqlalchemy import create_engine 
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker 
 
 from core.config import settings 
+from database.pool import PoolMetrics , engine_options , instrument_engine , pool_status
 from models.base import Base 
 
-engine = create_engine(settings.DATABASE_URL , pool_pre_ping=True)
+sync_pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+engine = create_engine(settings.DATABASE_URL , **engine_options(settings.DATABASE_URL , sync_pool_metrics))
+instrument_engine(engine , sync_pool_metrics)
 
 SessionLocal = sessionmaker(autoflush= False , autocommit = False , bind = engine)
 def create_table_db():
@@ -19,3 +25,49 @@ def get_db() -> Generator :
   finally : 
     db.close()
     
+# ----------------- Async (route async def) -----------------
+# Driver async tương ứng với driver sync trong DATABASE_URL
+ASYNC_DRIVERS = {
+  "sqlite" : "sqlite+aiosqlite" ,
+  "mysql" : "mysql+aiomysql" ,
+  "postgresql" : "postgresql+asyncpg" ,
+}
+
+def get_async_database_url() -> str:
+  if settings.ASYNC_DATABASE_URL:
+    return settings.ASYNC_DATABASE_URL
+  url = make_url(settings.DATABASE_URL)
+  backend = url.get_backend_name()
+  if backend not in ASYNC_DRIVERS:
+    raise RuntimeError(f"Chưa hỗ trợ driver async cho {backend}, hãy cấu hình ASYNC_DATABASE_URL")
+  return url.set(drivername = ASYNC_DRIVERS[backend]).render_as_string(hide_password = False)
+
+_async_engine = None
+_async_session_factory = None
+
+# Tạo engine async khi cần lần đầu: script chỉ dùng đường sync không cần cài driver async
+def get_async_session_factory():
+  global _async_engine , _async_session_factory
+  if _async_session_factory is None:
+    from sqlalchemy.ext.asyncio import async_sessionmaker , create_async_engine
+
+    url = get_async_database_url()
+    _async_engine = create_async_engine(url , **engine_options(url , async_pool_metrics , is_async = True))
+    instrument_engine(_async_engine.sync_engine , async_pool_metrics)
+    # expire_on_commit=False: đọc thuộc tính sau commit không phát sinh I/O ngầm
+    _async_session_factory = async_sessionmaker(_async_engine , autoflush= False , expire_on_commit= False)
+  return _async_session_factory
+
+async def get_async_db() -> AsyncGenerator : 
+  async with get_async_session_factory()() as db : 
+    yield db 
+
+def get_pool_stats() -> dict:
+  stats = {"sync": pool_status(engine , sync_pool_metrics)}
+  if _async_engine is not None:
+    stats["async"] = pool_status(_async_engine.sync_engine , async_pool_metrics)
+  return stats
+
+async def dispose_async_engine():
+  if _async_engine is not None:
+    await _async_engine.dispose()
@@ -0,0 +1,197 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.util import queue as sqla_queue
+
+from core.config import settings
+
+# Mốc (ms) của histogram thời gian chờ lấy kết nối
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+PRE_PING_STRATEGIES = ("always", "idle", "none")
+
+
+class PoolMetrics:
+  """Số liệu pool gom từ pool event + đo thời gian trong TimedQueuePool"""
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self.reset()
+
+  def reset(self) -> None:
+    self.checkouts = 0
+    self.connects = 0
+    self.invalidations = 0
+    self.timeouts = 0
+    self.idle_pings = 0
+    self.idle_ping_failures = 0
+    self._wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+    self._wait_total_ms = 0.0
+    self._wait_max_ms = 0.0
+    self._checkout_total_ms = 0.0
+    self._checkout_max_ms = 0.0
+
+  def record_wait(self , ms : float , timed_out : bool = False) -> None:
+    with self._lock:
+      self._wait_buckets[bisect_left(WAIT_BUCKETS_MS , ms)] += 1
+      self._wait_total_ms += ms
+      self._wait_max_ms = max(self._wait_max_ms , ms)
+      if timed_out:
+        self.timeouts += 1
+
+  def record_checkout(self , ms : float) -> None:
+    with self._lock:
+      self.checkouts += 1
+      self._checkout_total_ms += ms
+      self._checkout_max_ms = max(self._checkout_max_ms , ms)
+
+  def incr(self , name : str) -> None:
+    with self._lock:
+      setattr(self , name , getattr(self , name) + 1)
+
+  def snapshot(self) -> dict:
+    with self._lock:
+      waits = sum(self._wait_buckets)
+      labels = [f"<={ms}ms" for ms in WAIT_BUCKETS_MS] + [f">{WAIT_BUCKETS_MS[-1]}ms"]
+      return {
+        "checkouts": self.checkouts,
+        "connects": self.connects,
+        "invalidations": self.invalidations,
+        "timeouts": self.timeouts,
+        "idle_pings": self.idle_pings,
+        "idle_ping_failures": self.idle_ping_failures,
+        "wait_ms": {
+          "avg": round(self._wait_total_ms / waits , 3) if waits else 0,
+          "max": round(self._wait_max_ms , 3),
+          "histogram": dict(zip(labels , self._wait_buckets)),
+        },
+        "checkout_ms": {
+          "avg": round(self._checkout_total_ms / self.checkouts , 3) if self.checkouts else 0,
+          "max": round(self._checkout_max_ms , 3),
+        },
+      }
+
+
+def timed_queue_class(base : type , metrics : PoolMetrics) -> type:
+  """
+  Hàng đợi kết nối rảnh của pool, chỉ đo lúc get() (chờ kết nối được trả về khi
+  pool đã đầy). Thời gian mở kết nối mới (overflow) nằm ngoài hàng đợi nên không bị tính.
+  """
+
+  def get(self , block = True , timeout = None):
+    # _do_get luôn truyền timeout; dispose() rút kết nối bằng get(False) thì bỏ qua
+    if timeout is None:
+      return base.get(self , block , timeout)
+    started = time.perf_counter()
+    try:
+      record = base.get(self , block , timeout)
+    except sqla_queue.Empty:
+      # block=True mà rỗng: pool báo TimeoutError; block=False: pool mở kết nối mới
+      metrics.record_wait((time.perf_counter() - started) * 1000 , timed_out=block)
+      raise
+    metrics.record_wait((time.perf_counter() - started) * 1000)
+    return record
+
+  return type(f"Timed{base.__name__}" , (base ,) , {"get": get})
+
+
+def timed_pool_class(base : type , metrics : PoolMetrics) -> type:
+  """
+  Lớp pool con ghi lại:
+  - thời gian chờ kết nối rảnh trong hàng đợi (timed_queue_class),
+  - tổng thời gian connect() (chờ + mở kết nối mới + pre-ping + event checkout).
+  Tạo lớp riêng cho mỗi engine vì pool.recreate() dựng lại bằng self.__class__.
+  """
+
+  def connect(self):
+    started = time.perf_counter()
+    connection = base.connect(self)
+    metrics.record_checkout((time.perf_counter() - started) * 1000)
+    return connection
+
+  return type(f"Timed{base.__name__}" , (base ,) , {
+    "_queue_class": timed_queue_class(base._queue_class , metrics) ,
+    "connect": connect ,
+  })
+
+
+def _is_sqlite_memory(url) -> bool:
+  return url.get_backend_name() == "sqlite" and (
+    url.database in (None , "" , ":memory:") or url.query.get("mode") == "memory"
+  )
+
+
+def engine_options(database_url : str , metrics : PoolMetrics , is_async : bool = False) -> Dict:
+  """Tham số pool cho create_engine / create_async_engine lấy từ settings"""
+  if settings.DB_PRE_PING not in PRE_PING_STRATEGIES:
+    raise RuntimeError(f"DB_PRE_PING phải là một trong {PRE_PING_STRATEGIES}")
+
+  options = {"pool_pre_ping": settings.DB_PRE_PING == "always"}
+  # SQLite trong bộ nhớ dùng SingletonThreadPool / StaticPool: không nhận tham số kích thước
+  if _is_sqlite_memory(make_url(database_url)):
+    return options
+
+  base = AsyncAdaptedQueuePool if is_async else QueuePool
+  options.update(
+    poolclass = timed_pool_class(base , metrics) ,
+    pool_size = settings.DB_POOL_SIZE ,
+    max_overflow = settings.DB_MAX_OVERFLOW ,
+    pool_timeout = settings.DB_POOL_TIMEOUT ,
+    pool_recycle = settings.DB_POOL_RECYCLE ,
+  )
+  return options
+
+
+def instrument_engine(engine : Engine , metrics : PoolMetrics) -> None:
+  """Gắn pool event để đếm kết nối; DB_PRE_PING=idle thì chỉ ping kết nối để rảnh lâu"""
+
+  @event.listens_for(engine , "connect")
+  def on_connect(dbapi_connection , connection_record):
+    metrics.incr("connects")
+
+  @event.listens_for(engine , "invalidate")
+  def on_invalidate(dbapi_connection , connection_record , exception):
+    metrics.incr("invalidations")
+
+  @event.listens_for(engine , "checkin")
+  def on_checkin(dbapi_connection , connection_record):
+    connection_record.info["last_checkin"] = time.monotonic()
+
+  if settings.DB_PRE_PING != "idle":
+    return
+
+  @event.listens_for(engine , "checkout")
+  def on_checkout(dbapi_connection , connection_record , connection_proxy):
+    last_checkin = connection_record.info.get("last_checkin")
+    if last_checkin is None or time.monotonic() - last_checkin < settings.DB_PRE_PING_IDLE_SECONDS:
+      return
+    metrics.incr("idle_pings")
+    try:
+      cursor = dbapi_connection.cursor()
+      cursor.execute("SELECT 1")
+      cursor.close()
+    except Exception as e:
+      metrics.incr("idle_ping_failures")
+      # Pool bỏ kết nối hỏng và thử lấy kết nối khác
+      raise exc.DisconnectionError() from e
+
+
+def pool_status(engine : Engine , metrics : PoolMetrics) -> dict:
+  pool = engine.pool
+  status = {"pool_class": type(pool).__name__}
+  if isinstance(pool , QueuePool):
+    status.update(
+      size = pool.size(),
+      checked_out = pool.checkedout(),
+      checked_in = pool.checkedin(),
+      overflow = max(pool.overflow() , 0),
+      max_overflow = settings.DB_MAX_OVERFLOW,
+      timeout = pool.timeout(),
+    )
+  status.update(metrics.snapshot())
+  return status
@@ -0,0 +1,37 @@
+import base64
+import json
+from typing import Any, Callable, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+
+
+# Cursor phân trang dạng opaque: base64 của danh sách giá trị khóa của dòng cuối
+def encode_cursor(values: List[Any]) -> str:
+  raw = json.dumps(values, separators=(",", ":"), default=str)
+  return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+# parsers: hàm chuyển kiểu cho từng giá trị (None = giữ nguyên); sai kiểu cũng trả 400
+def decode_cursor(
+  cursor: str,
+  size: int,
+  parsers: Optional[Sequence[Optional[Callable[[Any], Any]]]] = None,
+) -> List[Any]:
+  invalid = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Cursor không hợp lệ"
+  )
+  try:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+  except ValueError:
+    values = None
+
+  if not isinstance(values, list) or len(values) != size:
+    raise invalid
+  if parsers:
+    try:
+      values = [parse(v) if parse else v for parse, v in zip(parsers, values)]
+    except (TypeError, ValueError):
+      raise invalid
+  return values
@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Iterable, Iterator, List, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+
+# Số dòng mỗi lần lấy từ server-side cursor
+EXPORT_YIELD_PER = 1000
+
+EXPORT_MEDIA_TYPES = {
+  "csv": "text/csv",
+  "ndjson": "application/x-ndjson",
+}
+
+
+def _plain(value: Any) -> Any:
+  if isinstance(value, Enum):
+    return value.value
+  if isinstance(value, (datetime, date)):
+    return value.isoformat()
+  return value
+
+
+def _encode_csv(columns: Sequence[str]) -> Callable[[Iterable[Sequence[Any]]], str]:
+  def encode(rows: Iterable[Sequence[Any]]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_plain(v) for v in row] for row in rows)
+    return buffer.getvalue()
+  return encode
+
+
+def _encode_ndjson(columns: Sequence[str]) -> Callable[[Iterable[Sequence[Any]]], str]:
+  def encode(rows: Iterable[Sequence[Any]]) -> str:
+    return "".join(
+      json.dumps({c: _plain(v) for c, v in zip(columns, row)}, ensure_ascii=False) + "\n"
+      for row in rows
+    )
+  return encode
+
+
+def stream_query(
+  session_factory: Callable[[], Session],
+  query: Select,
+  columns: List[str],
+  fmt: str = "csv",
+  gzip: bool = False,
+) -> Iterator[bytes]:
+  """
+  Stream kết quả query ra CSV / NDJSON theo từng lô EXPORT_YIELD_PER dòng.
+  - Dùng session riêng (đóng khi stream xong) vì response còn chạy sau khi
+    dependency get_db đã kết thúc.
+  - stream_results + yield_per: dùng server-side cursor, bộ nhớ không tăng theo số dòng.
+  """
+  encode = _encode_csv(columns) if fmt == "csv" else _encode_ndjson(columns)
+  compressor = zlib.compressobj(wbits=31) if gzip else None
+
+  def emit(text: str, flush: bool = False) -> bytes:
+    data = text.encode("utf-8")
+    if compressor is None:
+      return data
+    data = compressor.compress(data)
+    if flush:
+      data += compressor.flush(zlib.Z_SYNC_FLUSH)
+    return data
+
+  # Header gửi ngay để client nhận byte đầu tiên trước khi query chạy xong
+  if fmt == "csv":
+    yield emit(encode([columns]), flush=True)
+
+  db = session_factory()
+  try:
+    result = db.execute(
+      query.execution_options(stream_results=True, yield_per=EXPORT_YIELD_PER)
+    )
+    for partition in result.partitions():
+      chunk = emit(encode(partition), flush=True)
+      if chunk:
+        yield chunk
+  finally:
+    db.close()
+
+  if compressor is not None:
+    yield compressor.flush()
+
+
+def export_response(
+  session_factory: Callable[[], Session],
+  query: Select,
+  columns: List[str],
+  filename: str,
+  fmt: str = "csv",
+  gzip: bool = False,
+) -> StreamingResponse:
+  filename = f"{filename}.{fmt}" + (".gz" if gzip else "")
+  return StreamingResponse(
+    stream_query(session_factory, query, columns, fmt=fmt, gzip=gzip),
+    media_type="application/gzip" if gzip else EXPORT_MEDIA_TYPES[fmt],
+    headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+  )
@@ -1,6 +1,20 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
 from passlib.context import CryptContext 
 
-pwd_context = CryptContext(schemes=["bcrypt"] , deprecated = "auto")
+from core.config import settings
+
+# min = max = BCRYPT_ROUNDS: hash cũ khác cost sẽ được băm lại khi đăng nhập
+pwd_context = CryptContext(
+  schemes=["bcrypt"] ,
+  deprecated = "auto" ,
+  bcrypt__rounds = settings.BCRYPT_ROUNDS ,
+  bcrypt__min_rounds = settings.BCRYPT_ROUNDS ,
+  bcrypt__max_rounds = settings.BCRYPT_ROUNDS ,
+)
 
 def verify_password(password_input : str , password_in_db : str):
   return pwd_context.verify(password_input , password_in_db)
@@ -8,3 +22,121 @@ def verify_password(password_input : str , password_in_db : str):
 def hash_password(password_input : str):
   return pwd_context.hash(password_input)
 
+def verify_and_update(password_input : str , password_in_db : str) -> Tuple[bool , Optional[str]]:
+  return pwd_context.verify_and_update(password_input , password_in_db)
+
+
+# ----------------- Pool process cho bcrypt -----------------
+# Hàm top-level để pickle được sang process con
+def _map_chunk(fn , chunk : list) -> list:
+  return [fn(item) for item in chunk]
+
+class PasswordPoolBusy(Exception):
+  """Hàng đợi băm mật khẩu đã đầy, request nên trả 503"""
+
+
+class PasswordHasherPool:
+  """
+  Chạy bcrypt trên ProcessPoolExecutor riêng để không chiếm threadpool của FastAPI.
+  Số việc đang chờ bị giới hạn: vượt workers + max_queue thì từ chối ngay.
+  """
+
+  def __init__(self , workers : int , max_queue : int , bulk_concurrency : int = 0):
+    self.workers = workers
+    self.max_queue = max_queue
+    self.bulk_concurrency = bulk_concurrency or workers
+    self._lock = threading.Lock()
+    self._executor : Optional[ProcessPoolExecutor] = None
+    self._in_flight = 0
+    self._completed = 0
+    self._failed = 0
+    self._rejected = 0
+
+  def _get_executor(self) -> ProcessPoolExecutor:
+    with self._lock:
+      if self._executor is None:
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+      return self._executor
+
+  async def run(self , fn , *args):
+    with self._lock:
+      if self._in_flight >= self.workers + self.max_queue:
+        self._rejected += 1
+        raise PasswordPoolBusy()
+      self._in_flight += 1
+    try:
+      loop = asyncio.get_running_loop()
+      result = await loop.run_in_executor(self._get_executor() , fn , *args)
+    except BaseException:
+      # Lỗi trong worker, pool bị tắt hoặc request bị hủy: không tính là hoàn thành
+      with self._lock:
+        self._in_flight -= 1
+        self._failed += 1
+      raise
+    with self._lock:
+      self._in_flight -= 1
+      self._completed += 1
+    return result
+
+  async def map(self , fn , items : list , chunksize : int = 16) -> list:
+    """
+    Chạy cả lô trên pool (nhập hàng loạt): chia chunk và gửi từng chunk qua run(),
+    nên mỗi chunk được tính vào hàng đợi như một request. Tối đa bulk_concurrency
+    chunk chạy song song (mặc định bằng số worker); hàng đợi đầy thì báo
+    PasswordPoolBusy như run().
+    """
+    if not items:
+      return []
+    limit = asyncio.Semaphore(max(self.bulk_concurrency , 1))
+
+    async def run_chunk(chunk : list) -> list:
+      async with limit:
+        return await self.run(_map_chunk , fn , chunk)
+
+    tasks = [
+      asyncio.ensure_future(run_chunk(items[i:i + chunksize]))
+      for i in range(0 , len(items) , chunksize)
+    ]
+    try:
+      results = await asyncio.gather(*tasks)
+    except BaseException:
+      # Một chunk lỗi thì bỏ các chunk chưa chạy, không băm tiếp vô ích
+      for task in tasks:
+        task.cancel()
+      raise
+    return [value for chunk in results for value in chunk]
+
+  def stats(self) -> dict:
+    with self._lock:
+      return {
+        "workers": self.workers,
+        "max_queue": self.max_queue,
+        "in_flight": self._in_flight,
+        "queue_depth": max(self._in_flight - self.workers , 0),
+        "completed": self._completed,
+        "failed": self._failed,
+        "rejected": self._rejected,
+      }
+
+  def shutdown(self) -> None:
+    with self._lock:
+      executor , self._executor = self._executor , None
+    if executor is not None:
+      executor.shutdown(wait=False , cancel_futures=True)
+
+
+password_pool = PasswordHasherPool(
+  settings.PASSWORD_HASH_WORKERS ,
+  settings.PASSWORD_HASH_MAX_QUEUE ,
+  settings.PASSWORD_HASH_BULK_CONCURRENCY ,
+)
+
+async def hash_password_async(password_input : str) -> str:
+  return await password_pool.run(hash_password , password_input)
+
+async def hash_passwords_async(passwords : list) -> list:
+  return await password_pool.map(hash_password , passwords)
+
+# Trả (hợp lệ, hash mới nếu cần băm lại với cost hiện tại)
+async def verify_and_update_async(password_input : str , password_in_db : str) -> Tuple[bool , Optional[str]]:
+  return await password_pool.run(verify_and_update , password_input , password_in_db)
@@ -0,0 +1,30 @@
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class QueryCounter:
+  """Đếm số câu lệnh SQL thực sự gửi xuống database"""
+
+  def __init__(self):
+    self.count = 0
+
+  def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+    self.count += 1
+
+
+@contextmanager
+def count_queries(db: Session) -> Iterator[QueryCounter]:
+  """
+  Gắn listener vào connection của session hiện tại (không phải cả engine),
+  nên chỉ đếm các query của request này.
+  """
+  counter = QueryCounter()
+  conn = db.connection()
+  event.listen(conn, "before_cursor_execute", counter._on_execute)
+  try:
+    yield counter
+  finally:
+    event.remove(conn, "before_cursor_execute", counter._on_execute)
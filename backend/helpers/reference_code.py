@@ -0,0 +1,19 @@
+import re
+from typing import Optional, Tuple
+
+# Mã tham chiếu sinh viên ghi vào nội dung chuyển khoản: KTX<contract_id>T<tháng>N<năm>
+# Ví dụ: KTX12T05N2025
+REFERENCE_CODE_PATTERN = re.compile(r"KTX\s*-?\s*(\d+)\s*-?\s*T\s*(\d{1,2})\s*-?\s*N\s*(\d{4})", re.IGNORECASE)
+
+
+def make_reference_code(contract_id: int, month: int, year: int) -> str:
+  return f"KTX{contract_id}T{month:02d}N{year}"
+
+
+def parse_reference_code(text: str) -> Optional[Tuple[int, int, int]]:
+  """Tìm mã tham chiếu trong nội dung giao dịch, trả về (contract_id, month, year)"""
+  match = REFERENCE_CODE_PATTERN.search(text or "")
+  if not match:
+    return None
+  contract_id, month, year = (int(g) for g in match.groups())
+  return contract_id, month, year
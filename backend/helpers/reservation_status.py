@@ -6,4 +6,5 @@ class ReservationStatus(str , Enum):
   PENDING = "pending"
   APPROVED = "approved"
   REJECTED = "rejected"
+  WAITLISTED = "waitlisted"
 
@@ -0,0 +1,6 @@
+from enum import Enum 
+
+class TransferStatus(str , Enum):
+  PENDING = "pending"
+  COMPLETED = "completed"
+  REJECTED = "rejected"
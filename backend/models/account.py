@@ -1,8 +1,9 @@
 from models.base import BareBaseModel
 
-from sqlalchemy import Column , String , Integer ,DateTime ,ForeignKey , Enum as SQLENUM
-from sqlalchemy.sql import func
+from sqlalchemy import Column , String , Integer ,DateTime ,ForeignKey , Boolean , Enum as SQLENUM
+from sqlalchemy.sql import func , true
 from sqlalchemy.orm import relationship
+from sqlalchemy.exc import IntegrityError
 
 from helpers.user_role import UserRole
 
@@ -11,9 +12,13 @@ from models.students import Student
 from helpers.pwd import hash_password , verify_password
 
 class Account(BareBaseModel):
-  username = Column(String(255) , nullable= False)
+  username = Column(String(255) , nullable= False , unique= True)
   password = Column(String(255) , nullable= False)
   role = Column(SQLENUM(UserRole, name="user_role_enum"), nullable=False, default=UserRole.STUDENT)
+  # False = admin đã khóa tài khoản, mọi token của account bị từ chối
+  is_active = Column(Boolean, nullable=False, default=True, server_default=true())
+  # Mốc UTC (theo giây): access token có iat trước mốc này bị từ chối, dùng chung mọi worker
+  tokens_valid_after = Column(DateTime , nullable= True)
   created_at = Column(DateTime(timezone=True), server_default=func.now())
   updated_at = Column(DateTime(timezone=True), onupdate=func.now())
   
@@ -21,38 +26,48 @@ class Account(BareBaseModel):
   student = relationship("Student", back_populates="account", uselist=False)
   
   @staticmethod
-  def create_account(db , data : AccountCreate):
-    check_account = db.query(Account).filter(Account.username == data.username).first()
+  def create_account(db , data : AccountCreate , password_hash : str = None):
+    # password_hash: đã băm sẵn trên pool process (route async)
+    data.password = password_hash or hash_password(data.password)
+    account = Account(
+      username = data.username , 
+      password = data.password ,
+      role = UserRole.STUDENT
+    )
     
-    if check_account : 
-      return 409, None, None
-    
-    else : 
-      data.password = hash_password(data.password)
-      account = Account(
-        username = data.username , 
-        password = data.password ,
-        role = UserRole.STUDENT
-      )
-      db.add(account)
-      db.commit()
-      db.refresh(account)
-      
-      # Tạo student liên kết với account 
-      student_data = data.student 
-      student = Student(
-        full_name = student_data.full_name ,
-        birth=student_data.birth,
-        gender=student_data.gender,
-        phone=student_data.phone,
-        email=student_data.email,
-        account_id=account.id
-      )
-      db.add(student)
+    # Tạo student liên kết với account, ghi cả hai trong cùng một transaction
+    student_data = data.student 
+    account.student = Student(
+      full_name = student_data.full_name ,
+      birth=student_data.birth,
+      gender=student_data.gender,
+      phone=student_data.phone,
+      email=student_data.email,
+    )
+    db.add(account)
+    try:
       db.commit()
-      db.refresh(student)
+    except IntegrityError:
+      # Trùng username / phone / email (unique index), không cần SELECT kiểm tra trước
+      db.rollback()
+      return 409 , None , None
+    
+    db.refresh(account)
+    student = account.student
     return 201 , account , student
   
+  @staticmethod 
+  def find_conflicts(db , username : str , phone : str , email : str) :
+    """Các trường bị trùng, dùng để báo lỗi sau khi insert thất bại"""
+    conflicts = []
+    if db.query(Account.id).filter(Account.username == username).first():
+      conflicts.append("username")
+    if db.query(Student.id).filter(Student.phone == phone).first():
+      conflicts.append("phone")
+    if db.query(Student.id).filter(Student.email == email).first():
+      conflicts.append("email")
+    return conflicts
+  
   @staticmethod 
   def authenticate(db , username : str , password : str) : 
     account = db.query(Account).filter(Account.username == username).first()
@@ -61,4 +76,8 @@ class Account(BareBaseModel):
     
     return 200 , account 
   
+  @staticmethod 
+  def get_by_username(db , username : str) :
+    return db.query(Account).filter(Account.username == username).first()
+  
   
\ No newline at end of file
@@ -1,12 +1,16 @@
 from models.base import BareBaseModel 
 
-from sqlalchemy import Column , Integer , String , DateTime , ForeignKey , Enum as SQLENUM 
+from sqlalchemy import Column , Integer , String , DateTime , ForeignKey , Enum as SQLENUM , Index
 from sqlalchemy.sql import func 
 from sqlalchemy.orm import relationship 
 
 from helpers.contract_status import ContractStatus 
 
 class Contract(BareBaseModel):
+  __table_args__ = (
+    Index("ix_contract_status_end_date", "status", "end_date"),
+  )
+
   reservation_id = Column(Integer , ForeignKey("reservation.id") , nullable= False)
   start_date = Column(DateTime , nullable= False)
   end_date = Column(DateTime , nullable= False)
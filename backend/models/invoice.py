@@ -9,6 +9,8 @@ from helpers.invoice_status import InvoiceStatus
 class Invoice(BareBaseModel):
     id = Column(Integer, primary_key=True, index=True)
     contract_id = Column(Integer, ForeignKey("contract.id"), nullable=False)
+    # Phòng tại thời điểm lập phiếu thu, dùng cho thống kê doanh thu theo phòng
+    room_id = Column(Integer, ForeignKey("room.id"), nullable=True)
     amount = Column(Float, nullable=False)
     month = Column(Integer, nullable=False)
     year = Column(Integer, nullable=False)
@@ -0,0 +1,20 @@
+from models.base import BareBaseModel
+
+from sqlalchemy import Column , Integer , ForeignKey , Enum as SQLENUM , Float , UniqueConstraint
+
+from helpers.invoice_status import InvoiceStatus
+
+class InvoiceRevenue(BareBaseModel):
+  """Bảng tổng hợp doanh thu theo (năm, tháng, phòng, trạng thái)"""
+  __table_args__ = (
+    UniqueConstraint("year", "month", "room_key", "status", name="uq_invoice_revenue_key"),
+  )
+
+  year = Column(Integer , nullable= False)
+  month = Column(Integer , nullable= False)
+  room_id = Column(Integer , ForeignKey("room.id") , nullable= True)
+  # room_id hoặc 0 khi không có phòng: NULL không va chạm trong unique key nên cần khóa khác NULL
+  room_key = Column(Integer , nullable= False , default= 0)
+  status = Column(SQLENUM(InvoiceStatus, name="invoice_status") , nullable= False)
+  invoice_count = Column(Integer , nullable= False , default= 0)
+  total_amount = Column(Float , nullable= False , default= 0)
@@ -0,0 +1,16 @@
+from models.base import BareBaseModel 
+
+from sqlalchemy import Column , Integer , ForeignKey , DateTime , String
+from sqlalchemy.sql import func 
+
+class RefreshToken(BareBaseModel):
+  account_id = Column(Integer , ForeignKey("account.id") , nullable= False , index= True)
+  # Chỉ lưu sha256 của token, token gốc chỉ client giữ
+  token_hash = Column(String(64) , nullable= False , unique= True)
+  # Các token sinh ra từ cùng một lần đăng nhập; dùng lại token cũ thì thu hồi cả family
+  family_id = Column(String(32) , nullable= False , index= True)
+  # jti của access token cấp cùng lúc, để thu hồi luôn khi phát hiện dùng lại
+  access_jti = Column(String(32) , nullable= False)
+  expires_at = Column(DateTime , nullable= False)
+  revoked_at = Column(DateTime , nullable= True)
+  created_at = Column(DateTime(timezone=True), server_default=func.now())
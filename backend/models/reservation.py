@@ -1,12 +1,18 @@
 from models.base import BareBaseModel 
 
-from sqlalchemy import Column , Integer , String , ForeignKey , DateTime , Enum as SQLENUM , Date
+from sqlalchemy import Column , Integer , String , ForeignKey , DateTime , Enum as SQLENUM , Date , Index
 from sqlalchemy.sql import func 
 from sqlalchemy.orm import relationship 
 
 from helpers.reservation_status import ReservationStatus
 
 class Reservation(BareBaseModel):
+  __table_args__ = (
+    Index("ix_reservation_status_booking_date", "status", "booking_date"),
+    Index("ix_reservation_room_id_status", "room_id", "status"),
+    Index("ix_reservation_student_id_booking_date", "student_id", "booking_date"),
+  )
+
   student_id = Column(Integer , ForeignKey("student.id") , nullable= False)
   room_id = Column(Integer , ForeignKey("room.id") , nullable = False)
   booking_date = Column(DateTime(timezone=True), server_default=func.now())
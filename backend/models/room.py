@@ -1,14 +1,20 @@
 from models.base import BareBaseModel 
 
-from sqlalchemy import Column , String , Integer , ForeignKey , DateTime , Float , Boolean
+from sqlalchemy import Column , String , Integer , ForeignKey , DateTime , Float , Boolean , Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
 class Room(BareBaseModel):
-  room_code = Column(String(255) , nullable= False)
+  __table_args__ = (
+    Index("ix_room_active_price", "active", "price"),
+  )
+
+  room_code = Column(String(255) , nullable= False , unique= True)
   capacity = Column(Integer , nullable= False)
   price = Column(Float , nullable = False)
   active = Column(Boolean, default=True, nullable=False)
+  # Số chỗ đã có người (reservation APPROVED còn hợp đồng), cập nhật bằng UPDATE có điều kiện
+  current_occupancy = Column(Integer, default=0, server_default="0", nullable=False)
   # Quan hệ 
   reservations = relationship("Reservation" , back_populates= "room")
   
\ No newline at end of file
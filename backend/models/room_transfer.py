@@ -0,0 +1,18 @@
+from models.base import BareBaseModel 
+
+from sqlalchemy import Column , Integer , ForeignKey , DateTime , Enum as SQLENUM
+from sqlalchemy.sql import func 
+from sqlalchemy.orm import relationship 
+
+from helpers.transfer_status import TransferStatus
+
+class RoomTransfer(BareBaseModel):
+  contract_id = Column(Integer , ForeignKey("contract.id") , nullable= False , index= True)
+  from_room_id = Column(Integer , ForeignKey("room.id") , nullable= False)
+  to_room_id = Column(Integer , ForeignKey("room.id") , nullable= False)
+  status = Column(SQLENUM(TransferStatus , name = "transfer_status") , nullable= False , default= TransferStatus.PENDING)
+  requested_at = Column(DateTime(timezone=True), server_default=func.now())
+  processed_at = Column(DateTime , nullable= True)
+  
+  # Quan hệ 
+  contract = relationship("Contract")
@@ -9,4 +9,5 @@ class AccountCreate(AccountBase):
   student : StudentCreate
 
 class UpdateAccount(BaseModel):
+  old_password : str 
   password : str 
\ No newline at end of file
@@ -1,4 +1,20 @@
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, Field, model_validator
+from datetime import date, datetime
+from typing import List, Optional
 class ContractExtendRequest(BaseModel):
-    new_end_date: datetime
\ No newline at end of file
+    new_end_date: datetime
+
+class ContractBulkExtendRequest(BaseModel):
+    contract_ids: Optional[List[int]] = None
+    room_ids: Optional[List[int]] = None
+    expiring_before: Optional[date] = None
+    new_end_date: Optional[datetime] = None
+    extend_months: Optional[int] = Field(None, ge=1, le=60)
+
+    @model_validator(mode="after")
+    def check_bulk_extend(self):
+        if (self.new_end_date is None) == (self.extend_months is None):
+            raise ValueError("Cần đúng một trong hai: new_end_date hoặc extend_months")
+        if not (self.contract_ids or self.room_ids or self.expiring_before):
+            raise ValueError("Cần ít nhất một điều kiện lọc: contract_ids, room_ids, expiring_before")
+        return self
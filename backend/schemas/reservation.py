@@ -1,10 +1,27 @@
-from pydantic import BaseModel 
+from pydantic import BaseModel , model_validator
 from datetime import date
-from typing import Optional
+from typing import List, Optional
+
+from helpers.reservation_status import ReservationStatus
 
 class ReservationCreate(BaseModel):
   room_id : int 
   booking_date : date 
   
 class ChangeRoomRequest(BaseModel):
-  new_room_id: int
\ No newline at end of file
+  new_room_id: int
+
+class ReservationBulkStatusRequest(BaseModel):
+  new_status: ReservationStatus
+  reservation_ids: Optional[List[int]] = None
+  room_id: Optional[int] = None
+  booked_from: Optional[date] = None
+  booked_to: Optional[date] = None
+
+  @model_validator(mode="after")
+  def check_bulk_request(self):
+    if self.new_status not in (ReservationStatus.APPROVED, ReservationStatus.REJECTED):
+      raise ValueError("new_status chỉ được là approved hoặc rejected")
+    if not (self.reservation_ids or self.room_id or self.booked_from or self.booked_to):
+      raise ValueError("Cần ít nhất một điều kiện lọc: reservation_ids, room_id, booked_from, booked_to")
+    return self
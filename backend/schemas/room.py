@@ -5,17 +5,19 @@ class RoomCreate(BaseModel):
   room_code: str
   capacity: int
   price: float
+  active: bool = True
 
 class RoomUpdate(BaseModel):
-  room_code: Optional[str]
-  capacity: Optional[int]
-  current_occupancy: Optional[int]
-  price: Optional[float]
-  active: Optional[bool]  
+  room_code: Optional[str] = None
+  capacity: Optional[int] = None
+  price: Optional[float] = None
+  active: Optional[bool] = None
   
-  @model_validator(mode="after")
-  def check_occupancy_update(self):
-    if self.current_occupancy > self.capacity : 
-        raise ValueError("current_occupancy không được lớn hơn capacity")
-    return self
+  # current_occupancy do services/occupancy cập nhật theo reservation được duyệt, không sửa tay
+  @model_validator(mode="before")
+  @classmethod
+  def reject_occupancy_update(cls, data):
+    if isinstance(data, dict) and "current_occupancy" in data:
+        raise ValueError("current_occupancy được tính tự động, không thể cập nhật")
+    return data
   
\ No newline at end of file
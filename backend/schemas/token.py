@@ -1,8 +1,26 @@
+from typing import Optional
+
 from pydantic import BaseModel 
 
 class Token(BaseModel):
   access_token : str 
   token_type : str 
+  refresh_token : Optional[str] = None
+
+class RefreshRequest(BaseModel):
+  refresh_token : str
+
+class LogoutRequest(BaseModel):
+  refresh_token : Optional[str] = None
 
 class TokenData(BaseModel):
-  user_id : str 
\ No newline at end of file
+  user_id : str 
+  role : Optional[str] = None
+  student_id : Optional[int] = None
+  jti : Optional[str] = None
+  iat : Optional[int] = None
+  exp : Optional[int] = None
+  
+  @property
+  def id(self) -> int:
+    return int(self.user_id)
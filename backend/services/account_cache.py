@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from core.config import settings
+from models.account import Account
+
+# Các cột được giữ lại trong bản sao (không giữ quan hệ student)
+ACCOUNT_COLUMNS = ("id", "username", "password", "role", "is_active", "tokens_valid_after", "created_at", "updated_at")
+
+
+class AccountCache:
+    """
+    Cache LRU có TTL cho dòng account của từng worker.
+    Lưu bản sao đã tách khỏi session; khi dùng thì merge(load=False)
+    vào session của request nên không phát sinh SELECT.
+    """
+
+    def __init__(self, ttl_seconds: int = 60, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[int, Tuple[Account, float]]" = OrderedDict()
+
+    def get(self, db: Session, account_id: int) -> Optional[Account]:
+        cached = self.get_detached(account_id)
+        if cached is None:
+            return None
+        return db.merge(cached, load=False)
+
+    def get_detached(self, account_id: int) -> Optional[Account]:
+        """Bản sao trong cache; route async tự merge vào AsyncSession của nó"""
+        with self._lock:
+            item = self._data.get(account_id)
+            if item is None:
+                return None
+            cached, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[account_id]
+                return None
+            self._data.move_to_end(account_id)
+            return cached
+
+    def put(self, account: Account) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        # Bản sao riêng: request khác có sửa object trong session cũng không ảnh hưởng cache
+        cached = Account(**{c: getattr(account, c) for c in ACCOUNT_COLUMNS})
+        make_transient_to_detached(cached)
+        with self._lock:
+            self._data[account.id] = (cached, time.monotonic() + self.ttl_seconds)
+            self._data.move_to_end(account.id)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate(self, account_id: int) -> None:
+        with self._lock:
+            self._data.pop(account_id, None)
+
+
+account_cache = AccountCache(settings.ACCOUNT_CACHE_TTL_SECONDS, settings.ACCOUNT_CACHE_MAX_ENTRIES)
@@ -1,22 +1,43 @@
+import hashlib
+import secrets
+import uuid
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
 from core.config import settings
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from database.init_db import get_db
+from database.init_db import get_async_db, get_db
 from schemas.token import TokenData
 from models.account import Account
+from models.refresh_token import RefreshToken
+from services.account_cache import account_cache
+from services.revocation import revoked_accounts, revoked_tokens, to_timestamp
 
 # OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 # Tạo access token
-def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
-    to_encode = {"sub": str(subject)}
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
+# role / student_id được ký trong token để route admin không phải đọc DB
+def create_access_token(
+    subject: str,
+    expires_delta: Optional[timedelta] = None,
+    role: Optional[str] = None,
+    student_id: Optional[int] = None,
+    jti: Optional[str] = None,
+) -> str:
+    now = datetime.utcnow()
+    to_encode = {"sub": str(subject), "jti": jti or uuid.uuid4().hex, "iat": now}
+    if role is not None:
+        to_encode["role"] = role
+    if student_id is not None:
+        to_encode["student_id"] = student_id
+    expire = now + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
     return jwt.encode(
         to_encode,
@@ -40,35 +61,204 @@ def decode_token(token: str) -> dict:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-# Lấy user từ token
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> Account:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Không thể xác thực người dùng",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Không thể xác thực người dùng",
+    headers={"WWW-Authenticate": "Bearer"},
+)
 
+# Đọc claims trong token, không chạm DB
+def get_token_data(token: str = Depends(oauth2_scheme)) -> TokenData:
     payload = decode_token(token)
     user_id: str = payload.get("sub")
     if not user_id:
         raise credentials_exception
 
-    token_data = TokenData(user_id=user_id)
+    token_data = TokenData(
+        user_id=user_id,
+        role=payload.get("role"),
+        student_id=payload.get("student_id"),
+        jti=payload.get("jti"),
+        iat=payload.get("iat"),
+        exp=payload.get("exp"),
+    )
+    if revoked_accounts.is_revoked(token_data.id):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Tài khoản đã bị khóa",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    # Kiểm tra thu hồi hoàn toàn trong bộ nhớ, không chạm DB
+    if revoked_tokens.is_revoked(token_data.jti, token_data.id, token_data.iat or 0):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token đã bị thu hồi",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return token_data
+
+# Route không bắt buộc đăng nhập: token thiếu / sai thì trả None
+def get_optional_token_data(token: Optional[str] = Depends(optional_oauth2_scheme)) -> Optional[TokenData]:
+    if not token:
+        return None
+    try:
+        return get_token_data(token)
+    except HTTPException:
+        return None
+
+def load_account(db: Session, account_id: int) -> Account:
+    account = account_cache.get(db, account_id)
+    if account is None:
+        account = db.query(Account).filter(Account.id == account_id).first()
+        if not account:
+            raise credentials_exception
+        account_cache.put(account)
+    return _ensure_active(account)
+
+def _ensure_active(account: Account) -> Account:
+    if not account.is_active:
+        revoked_accounts.revoke([account.id])
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Tài khoản đã bị khóa",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return account
+
+async def load_account_async(db: AsyncSession, account_id: int) -> Account:
+    cached = account_cache.get_detached(account_id)
+    if cached is not None:
+        return _ensure_active(await db.merge(cached, load=False))
 
-    account = db.query(Account).filter(Account.id == int(token_data.user_id)).first()
+    account = (await db.execute(select(Account).where(Account.id == account_id))).scalar_one_or_none()
     if not account:
         raise credentials_exception
+    account_cache.put(account)
+    return _ensure_active(account)
 
+# Token cấp trước account.tokens_valid_after (đổi mật khẩu ở worker khác) bị từ chối
+def _ensure_token_fresh(account: Account, token_data: TokenData) -> Account:
+    if account.tokens_valid_after is None:
+        return account
+    not_before = to_timestamp(account.tokens_valid_after)
+    if (token_data.iat or 0) < not_before:
+        revoked_tokens.revoke_account(account.id, not_before)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token đã bị thu hồi",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return account
 
-# Check quyền admin
-def admin_required(current_account: Account = Depends(get_current_user)) -> Account:
-    if current_account.role != "admin":
+# Lấy user từ token (dòng account lấy từ cache nếu còn hạn)
+def get_current_user(
+    token_data: TokenData = Depends(get_token_data),
+    db: Session = Depends(get_db)
+) -> Account:
+    return _ensure_token_fresh(load_account(db, token_data.id), token_data)
+
+# Bản async cho route async def (dùng AsyncSession, không đụng session sync)
+async def get_current_user_async(
+    token_data: TokenData = Depends(get_token_data),
+    db: AsyncSession = Depends(get_async_db)
+) -> Account:
+    return _ensure_token_fresh(await load_account_async(db, token_data.id), token_data)
+
+# Check quyền admin theo account hiện tại (qua cache TTL, dùng chung DB giữa các worker):
+# account bị khóa hoặc hạ quyền ở worker khác hết hiệu lực chậm nhất sau ACCOUNT_CACHE_TTL_SECONDS
+def admin_required(
+    token_data: TokenData = Depends(get_token_data),
+    db: Session = Depends(get_db)
+) -> TokenData:
+    account = _ensure_token_fresh(load_account(db, token_data.id), token_data)
+    token_data.role = account.role.value
+    if token_data.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Bạn không đủ thẩm quyền để truy cập"
         )
-    return current_account
+    return token_data
+
+# Khóa / mở khóa account: có hiệu lực ngay trong worker này, worker khác thấy sau khi cache account hết hạn
+def set_account_active(db: Session, account: Account, active: bool) -> None:
+    account.is_active = active
+    db.commit()
+    account_cache.invalidate(account.id)
+    if active:
+        revoked_accounts.restore([account.id])
+    else:
+        revoked_accounts.revoke([account.id])
+
+# ----------------- Refresh token -----------------
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+# Cấp cặp access + refresh token, không commit (đi chung transaction với thao tác gốc)
+def issue_tokens(db: Session, account: Account, student_id: Optional[int] = None, family_id: Optional[str] = None) -> dict:
+    jti = uuid.uuid4().hex
+    access_token = create_access_token(
+        subject=str(account.id),
+        role=account.role.value,
+        student_id=student_id,
+        jti=jti,
+    )
+    refresh_token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        account_id=account.id,
+        token_hash=hash_refresh_token(refresh_token),
+        family_id=family_id or uuid.uuid4().hex,
+        access_jti=jti,
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+def revoke_refresh_tokens(db: Session, *conditions) -> int:
+    """Thu hồi các refresh token còn hiệu lực và access token đi kèm, không commit"""
+    jtis = db.execute(
+        select(RefreshToken.access_jti).where(RefreshToken.revoked_at.is_(None), *conditions)
+    ).scalars().all()
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.revoked_at.is_(None), *conditions)
+        .values(revoked_at=datetime.utcnow())
+    )
+    for jti in jtis:
+        revoked_tokens.revoke(jti)
+    return len(jtis)
+
+def rotate_refresh_token(db: Session, refresh_token: str) -> dict:
+    """
+    Đổi refresh token lấy cặp token mới (refresh token cũ hết hiệu lực).
+    Token đã bị thu hồi mà vẫn được gửi lên = bị lộ: thu hồi cả family.
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Refresh token không hợp lệ",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    row = db.execute(
+        select(RefreshToken)
+        .where(RefreshToken.token_hash == hash_refresh_token(refresh_token))
+        .with_for_update()
+    ).scalar_one_or_none()
+    if row is None:
+        raise invalid
+
+    if row.revoked_at is not None:
+        revoke_refresh_tokens(db, RefreshToken.family_id == row.family_id)
+        db.commit()
+        raise invalid
+    if row.expires_at < datetime.utcnow():
+        raise invalid
+
+    account = load_account(db, row.account_id)
+    row.revoked_at = datetime.utcnow()
+    student_id = account.student.id if account.student else None
+    tokens = issue_tokens(db, account, student_id=student_id, family_id=row.family_id)
+    db.commit()
+    return tokens
@@ -0,0 +1,164 @@
+import threading
+import time
+from bisect import insort
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.contract import Contract
+from models.reservation import Reservation
+from models.room import Room
+from models.students import Student
+from helpers.contract_status import ContractStatus
+from helpers.gender_enum import GenderEnum
+
+# (start, end, contract_id, gender) — ngày bắt đầu / kết thúc tính cả hai đầu
+Interval = Tuple[date, date, int, GenderEnum]
+
+
+@dataclass
+class RoomEntry:
+    room_id: int
+    room_code: str
+    capacity: int
+    price: float
+    active: bool
+    intervals: List[Interval] = field(default_factory=list)
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+class RoomAvailabilityIndex:
+    """
+    Index trong bộ nhớ: mỗi phòng giữ danh sách hợp đồng ACTIVE (sắp theo ngày bắt đầu).
+    Truy vấn phòng trống trong một khoảng ngày không cần chạm database.
+    Mỗi worker có index riêng, nên index tự dựng lại sau
+    AVAILABILITY_INDEX_TTL_SECONDS để nhận thay đổi từ worker khác.
+    """
+
+    def __init__(self, ttl_seconds: int = settings.AVAILABILITY_INDEX_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.RLock()
+        self._rooms: Dict[int, RoomEntry] = {}
+        self._built_at: Optional[float] = None
+
+    @property
+    def is_stale(self) -> bool:
+        return self._built_at is None or time.monotonic() - self._built_at > self.ttl_seconds
+
+    def build(self, db: Session) -> None:
+        rooms = self._load_rooms(db)
+        with self._lock:
+            self._rooms = rooms
+            self._built_at = time.monotonic()
+
+    def refresh_rooms(self, db: Session, room_ids: Iterable[int]) -> None:
+        """Nạp lại thông tin và hợp đồng của các phòng vừa thay đổi"""
+        room_ids = set(room_ids)
+        if not room_ids:
+            return
+        rooms = self._load_rooms(db, room_ids)
+        with self._lock:
+            for room_id in room_ids:
+                if room_id in rooms:
+                    self._rooms[room_id] = rooms[room_id]
+                else:
+                    self._rooms.pop(room_id, None)
+
+    def _load_rooms(self, db: Session, room_ids: Optional[set] = None) -> Dict[int, RoomEntry]:
+        room_query = select(Room.id, Room.room_code, Room.capacity, Room.price, Room.active)
+        contract_query = (
+            select(
+                Contract.start_date,
+                Contract.end_date,
+                Contract.id,
+                Student.gender,
+                Reservation.room_id,
+            )
+            .join(Reservation, Contract.reservation_id == Reservation.id)
+            .join(Student, Reservation.student_id == Student.id)
+            .where(Contract.status == ContractStatus.ACTIVE)
+        )
+        if room_ids is not None:
+            room_query = room_query.where(Room.id.in_(room_ids))
+            contract_query = contract_query.where(Reservation.room_id.in_(room_ids))
+
+        rooms = {row.id: RoomEntry(*row) for row in db.execute(room_query)}
+        for start, end, contract_id, gender, room_id in db.execute(contract_query):
+            if room_id in rooms:
+                insort(
+                    rooms[room_id].intervals,
+                    (_as_date(start), _as_date(end), contract_id, GenderEnum(gender)),
+                )
+        return rooms
+
+    @staticmethod
+    def _max_overlap(intervals: List[Interval], start: date, end: date) -> Tuple[int, set]:
+        """Số giường bị chiếm nhiều nhất tại một thời điểm trong [start, end]"""
+        events = []
+        genders = set()
+        for i_start, i_end, _, gender in intervals:
+            if i_start > end:
+                break
+            if i_end < start:
+                continue
+            genders.add(gender)
+            events.append((max(i_start, start), 1))
+            events.append((min(i_end, end) + timedelta(days=1), -1))
+
+        # Cùng một ngày: trả giường (-1) trước rồi mới nhận (+1)
+        events.sort()
+        occupied = peak = 0
+        for _, delta in events:
+            occupied += delta
+            peak = max(peak, occupied)
+        return peak, genders
+
+    def find_available(
+        self,
+        start: date,
+        end: date,
+        beds: int = 1,
+        min_capacity: Optional[int] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        gender: Optional[GenderEnum] = None,
+    ) -> List[dict]:
+        with self._lock:
+            rooms = list(self._rooms.values())
+
+        result = []
+        for room in rooms:
+            if not room.active:
+                continue
+            if min_capacity is not None and room.capacity < min_capacity:
+                continue
+            if min_price is not None and room.price < min_price:
+                continue
+            if max_price is not None and room.price > max_price:
+                continue
+
+            peak, genders = self._max_overlap(room.intervals, start, end)
+            free_beds = room.capacity - peak
+            if free_beds < beds:
+                continue
+            if gender is not None and genders - {gender}:
+                continue
+
+            result.append({
+                "id": room.room_id,
+                "room_code": room.room_code,
+                "capacity": room.capacity,
+                "price": room.price,
+                "free_beds": free_beds,
+            })
+        return sorted(result, key=lambda r: r["id"])
+
+
+availability_index = RoomAvailabilityIndex()
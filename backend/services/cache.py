@@ -0,0 +1,98 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from core.config import settings
+
+
+class CacheBackend(ABC):
+    """Giao diện chung cho cache: giá trị là bytes, version là bộ đếm tăng dần"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        ...
+
+    @abstractmethod
+    def get_version(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    def bump_version(self, key: str) -> int:
+        ...
+
+
+class InProcessLRUCache(CacheBackend):
+    """Cache LRU trong bộ nhớ của từng worker"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._versions = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def get_version(self, key: str) -> int:
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def bump_version(self, key: str) -> int:
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            return self._versions[key]
+
+
+class RedisCache(CacheBackend):
+    """Cache dùng chung giữa các worker (cần cài thêm gói redis)"""
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        self._client.set(key, value, ex=ttl)
+
+    def get_version(self, key: str) -> int:
+        return int(self._client.get(key) or 0)
+
+    def bump_version(self, key: str) -> int:
+        return int(self._client.incr(key))
+
+
+def create_cache_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis":
+        if not settings.REDIS_URL:
+            raise RuntimeError("CACHE_BACKEND=redis cần cấu hình REDIS_URL")
+        return RedisCache(settings.REDIS_URL)
+    return InProcessLRUCache(settings.CACHE_MAX_ENTRIES)
+
+
+cache = create_cache_backend()
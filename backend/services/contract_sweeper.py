@@ -0,0 +1,118 @@
+import logging
+import threading
+from collections import Counter
+from datetime import date, datetime, time
+from typing import List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.contract import Contract
+from models.reservation import Reservation
+from helpers.contract_status import ContractStatus
+from services.availability import availability_index
+from services.occupancy import release_seat
+from services.waitlist import promote_waitlist
+
+logger = logging.getLogger(__name__)
+
+
+def expire_contracts(
+    db: Session,
+    today: Optional[date] = None,
+    batch_size: int = settings.CONTRACT_SWEEP_BATCH_SIZE,
+) -> List[int]:
+    """
+    Chuyển các hợp đồng ACTIVE đã quá end_date sang INACTIVE theo từng lô.
+    - Mỗi lô commit riêng nên dừng giữa chừng thì lần chạy sau làm tiếp.
+    - Chỉ cập nhật dòng còn ACTIVE nên chạy lại nhiều lần vẫn an toàn.
+    - Trả chỗ trong phòng tương ứng. Trả về số dòng đã cập nhật của từng lô.
+    """
+    cutoff = datetime.combine(today or datetime.utcnow().date(), time.min)
+    batches = []
+    while True:
+        rows = db.execute(
+            select(Contract.id, Reservation.room_id)
+            .join(Reservation, Contract.reservation_id == Reservation.id)
+            .where(
+                Contract.status == ContractStatus.ACTIVE,
+                Contract.end_date < cutoff,
+            )
+            .order_by(Contract.id)
+            .limit(batch_size)
+            .with_for_update(of=Contract, skip_locked=True)
+        ).all()
+        if not rows:
+            break
+
+        touched = db.execute(
+            update(Contract)
+            .where(
+                Contract.id.in_([r.id for r in rows]),
+                Contract.status == ContractStatus.ACTIVE,
+            )
+            .values(status=ContractStatus.INACTIVE)
+        ).rowcount
+        freed = Counter(r.room_id for r in rows)
+        for room_id, seats in freed.items():
+            release_seat(db, room_id, seats)
+        promote_waitlist(db, freed)
+        db.commit()
+        availability_index.refresh_rooms(db, freed)
+
+        batches.append(touched)
+        logger.info("Contract sweep batch %d: expired %d contracts", len(batches), touched)
+    return batches
+
+
+class ContractSweeper:
+    """Luồng nền chạy expire_contracts định kỳ trong process của app"""
+
+    def __init__(self, session_factory, interval_seconds: int):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> List[int]:
+        db = self.session_factory()
+        try:
+            return expire_contracts(db)
+        finally:
+            db.close()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Contract sweep failed")
+            self._stop.wait(self.interval_seconds)
+
+    def start(self) -> None:
+        if self.interval_seconds <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="contract-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+if __name__ == "__main__":
+    # python -m services.contract_sweeper
+    from database.init_db import SessionLocal, create_table_db
+
+    logging.basicConfig(level=logging.INFO)
+    create_table_db()
+    db = SessionLocal()
+    try:
+        batches = expire_contracts(db)
+        print(f"Đã chuyển {sum(batches)} hợp đồng sang INACTIVE sau {len(batches)} lô: {batches}")
+    finally:
+        db.close()
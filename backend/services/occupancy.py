@@ -0,0 +1,71 @@
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from models.contract import Contract
+from models.reservation import Reservation
+from models.room import Room
+from helpers.contract_status import ContractStatus
+from helpers.reservation_status import ReservationStatus
+
+
+# Giữ chỗ trong phòng: chỉ tăng khi còn chỗ, an toàn khi nhiều admin duyệt cùng lúc
+def reserve_seat(db: Session, room_id: int, seats: int = 1) -> bool:
+    result = db.execute(
+        update(Room)
+        .where(
+            Room.id == room_id,
+            Room.current_occupancy + seats <= Room.capacity,
+        )
+        .values(current_occupancy=Room.current_occupancy + seats)
+    )
+    return result.rowcount == 1
+
+
+# Trả chỗ (hợp đồng hết hạn, chuyển phòng...), không để bộ đếm âm
+def release_seat(db: Session, room_id: int, seats: int = 1) -> bool:
+    result = db.execute(
+        update(Room)
+        .where(Room.id == room_id)
+        .values(current_occupancy=case(
+            (Room.current_occupancy >= seats, Room.current_occupancy - seats),
+            else_=0,
+        ))
+    )
+    return result.rowcount == 1
+
+
+def occupied_seats_subquery():
+    """Số reservation APPROVED của mỗi phòng mà hợp đồng chưa hết hiệu lực"""
+    return (
+        select(func.count(Reservation.id))
+        .outerjoin(Contract, Contract.reservation_id == Reservation.id)
+        .where(
+            Reservation.room_id == Room.id,
+            Reservation.status == ReservationStatus.APPROVED,
+            or_(Contract.id.is_(None), Contract.status != ContractStatus.INACTIVE),
+        )
+        .correlate(Room)
+        .scalar_subquery()
+    )
+
+
+# Tính lại bộ đếm của tất cả phòng từ bảng reservation
+def rebuild_occupancy(db: Session) -> int:
+    result = db.execute(
+        update(Room).values(current_occupancy=occupied_seats_subquery())
+    )
+    db.commit()
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    # python -m services.occupancy
+    from database.init_db import SessionLocal, create_table_db
+
+    create_table_db()
+    db = SessionLocal()
+    try:
+        rows = rebuild_occupancy(db)
+        print(f"Đã tính lại số chỗ đã ở của {rows} phòng")
+    finally:
+        db.close()
@@ -0,0 +1,189 @@
+import math
+import threading
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from core.config import settings
+
+PERIOD_SECONDS = {"second": 1, "minute": 60, "hour": 3600}
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    capacity: int
+    refill_per_second: float
+
+    @classmethod
+    def parse(cls, value: str) -> Optional["RateLimitRule"]:
+        """'20/minute' -> bucket 20 token, nạp lại 20 token mỗi phút. Rỗng hoặc '0' = không giới hạn"""
+        if not value or value.strip() == "0":
+            return None
+        count, _, period = value.strip().partition("/")
+        seconds = PERIOD_SECONDS[(period or "second").strip()]
+        return cls(capacity=int(count), refill_per_second=int(count) / seconds)
+
+
+class RateLimitBackend(ABC):
+    """Trả (được phép, số giây cần chờ) và trừ 1 token nếu được phép"""
+
+    @abstractmethod
+    def consume(self, key: str, rule: RateLimitRule) -> Tuple[bool, float]:
+        ...
+
+
+class InProcessTokenBuckets(RateLimitBackend):
+    """Token bucket trong bộ nhớ từng worker, giới hạn số key bằng LRU"""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def consume(self, key: str, rule: RateLimitRule) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(rule.capacity), now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(rule.capacity, bucket[0] + (now - bucket[1]) * rule.refill_per_second)
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True, 0.0
+            return False, (1 - bucket[0]) / rule.refill_per_second
+
+
+class RedisTokenBuckets(RateLimitBackend):
+    """Token bucket dùng chung giữa các worker (cần cài thêm gói redis)"""
+
+    # Đọc - nạp - trừ trong một script để nhiều worker không ghi đè nhau
+    SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+else
+  retry = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(retry)}
+"""
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    def consume(self, key: str, rule: RateLimitRule) -> Tuple[bool, float]:
+        allowed, retry = self._script(
+            keys=[f"ratelimit:{key}"],
+            args=[rule.capacity, rule.refill_per_second],
+        )
+        return bool(allowed), float(retry)
+
+
+def create_rate_limit_backend() -> RateLimitBackend:
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        if not settings.REDIS_URL:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis cần cấu hình REDIS_URL")
+        return RedisTokenBuckets(settings.REDIS_URL)
+    return InProcessTokenBuckets(settings.RATE_LIMIT_MAX_KEYS)
+
+
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimiter:
+    """
+    Giới hạn theo route với hai bucket: theo IP và theo tài khoản.
+    Ghi lại thời gian xử lý của chính limiter để theo dõi overhead (µs/request).
+    """
+
+    def __init__(self, backend: RateLimitBackend, rules: Dict[str, Dict[str, Optional[RateLimitRule]]]):
+        self.backend = backend
+        self.rules = rules
+        self._lock = threading.Lock()
+        self._checks = 0
+        self._rejected = 0
+        self._total_ns = 0
+        self._max_ns = 0
+
+    def check(self, route: str, request: Request, account: Optional[str] = None) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        started = time.perf_counter_ns()
+        rules = self.rules.get(route, {})
+        retry_after = 0.0
+        for scope, identity in (("ip", client_ip(request)), ("account", account)):
+            rule = rules.get(scope)
+            if rule is None or identity is None:
+                continue
+            allowed, wait = self.backend.consume(f"{route}:{scope}:{identity}", rule)
+            if not allowed:
+                retry_after = max(retry_after, wait)
+        elapsed = time.perf_counter_ns() - started
+
+        with self._lock:
+            self._checks += 1
+            self._total_ns += elapsed
+            self._max_ns = max(self._max_ns, elapsed)
+            if retry_after:
+                self._rejected += 1
+
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Bạn gửi quá nhiều yêu cầu, vui lòng thử lại sau",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": type(self.backend).__name__,
+                "checks": self._checks,
+                "rejected": self._rejected,
+                "avg_us": round(self._total_ns / self._checks / 1000, 2) if self._checks else 0,
+                "max_us": round(self._max_ns / 1000, 2),
+            }
+
+
+rate_limiter = RateLimiter(
+    create_rate_limit_backend(),
+    {
+        "login": {
+            "ip": RateLimitRule.parse(settings.RATE_LIMIT_LOGIN_PER_IP),
+            "account": RateLimitRule.parse(settings.RATE_LIMIT_LOGIN_PER_ACCOUNT),
+        },
+        "chatbot": {
+            "ip": RateLimitRule.parse(settings.RATE_LIMIT_CHATBOT_PER_IP),
+            "account": RateLimitRule.parse(settings.RATE_LIMIT_CHATBOT_PER_ACCOUNT),
+        },
+    },
+)
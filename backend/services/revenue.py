@@ -0,0 +1,146 @@
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models.contract import Contract
+from models.invoice import Invoice
+from models.invoice_revenue import InvoiceRevenue
+from models.reservation import Reservation
+from helpers.invoice_status import InvoiceStatus
+
+# (year, month, room_id, status) -> (số phiếu thu, số tiền)
+RevenueKey = Tuple[int, int, Optional[int], InvoiceStatus]
+RevenueDeltas = Dict[RevenueKey, Tuple[int, float]]
+
+
+def new_revenue_deltas() -> RevenueDeltas:
+    return defaultdict(lambda: (0, 0.0))
+
+
+def add_revenue_delta(
+    deltas: RevenueDeltas,
+    key: RevenueKey,
+    count: int,
+    amount: float,
+) -> None:
+    old_count, old_amount = deltas[key]
+    deltas[key] = (old_count + count, old_amount + amount)
+
+
+def payment_deltas(invoices: Iterable[Tuple[int, int, Optional[int], float]]) -> RevenueDeltas:
+    """
+    Chuyển các phiếu thu (year, month, room_id, amount) từ UNPAID sang PAID.
+    """
+    deltas = new_revenue_deltas()
+    for year, month, room_id, amount in invoices:
+        add_revenue_delta(deltas, (year, month, room_id, InvoiceStatus.UNPAID), -1, -amount)
+        add_revenue_delta(deltas, (year, month, room_id, InvoiceStatus.PAID), 1, amount)
+    return deltas
+
+
+UPSERT_DIALECTS = {
+    "mysql": mysql,
+    "mariadb": mysql,
+    "postgresql": postgresql,
+    "sqlite": sqlite,
+}
+
+
+def _upsert_statement(db: Session):
+    """
+    INSERT ... ON DUPLICATE KEY / ON CONFLICT cộng dồn vào dòng đã có:
+    hai transaction cùng ghi lần đầu một khóa không còn va nhau.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect not in UPSERT_DIALECTS:
+        raise RuntimeError(f"Chưa hỗ trợ upsert bảng tổng hợp doanh thu cho {dialect}")
+
+    stmt = UPSERT_DIALECTS[dialect].insert(InvoiceRevenue)
+    if dialect in ("mysql", "mariadb"):
+        return stmt.on_duplicate_key_update(
+            invoice_count=InvoiceRevenue.invoice_count + stmt.inserted.invoice_count,
+            total_amount=InvoiceRevenue.total_amount + stmt.inserted.total_amount,
+        )
+    return stmt.on_conflict_do_update(
+        index_elements=["year", "month", "room_key", "status"],
+        set_={
+            "invoice_count": InvoiceRevenue.invoice_count + stmt.excluded.invoice_count,
+            "total_amount": InvoiceRevenue.total_amount + stmt.excluded.total_amount,
+        },
+    )
+
+
+# Cập nhật bảng tổng hợp, không commit (để đi chung transaction với thao tác gốc)
+def apply_revenue_deltas(db: Session, deltas: RevenueDeltas) -> None:
+    rows = [
+        {
+            "year": year,
+            "month": month,
+            "room_id": room_id,
+            "room_key": room_id or 0,
+            "status": status,
+            "invoice_count": count,
+            "total_amount": amount,
+        }
+        for (year, month, room_id, status), (count, amount) in deltas.items()
+        if count != 0 or amount != 0
+    ]
+    # Từng dòng một: executemany với ON CONFLICT không được mọi driver hỗ trợ
+    stmt = _upsert_statement(db) if rows else None
+    for row in rows:
+        db.execute(stmt, row)
+
+
+# Tính lại toàn bộ bảng tổng hợp từ bảng invoice bằng một lần GROUP BY
+def rebuild_revenue_rollup(db: Session) -> int:
+    # Phiếu thu cũ chưa có room_id thì lấy phòng qua reservation
+    room_id = func.coalesce(Invoice.room_id, Reservation.room_id)
+    source = (
+        select(
+            Invoice.year,
+            Invoice.month,
+            room_id,
+            func.coalesce(room_id, 0),
+            Invoice.status,
+            func.count(Invoice.id),
+            func.sum(Invoice.amount),
+        )
+        .outerjoin(Contract, Invoice.contract_id == Contract.id)
+        .outerjoin(Reservation, Contract.reservation_id == Reservation.id)
+        .group_by(Invoice.year, Invoice.month, room_id, Invoice.status)
+    )
+
+    db.execute(delete(InvoiceRevenue))
+    result = db.execute(
+        insert(InvoiceRevenue).from_select(
+            ["year", "month", "room_id", "room_key", "status", "invoice_count", "total_amount"],
+            source,
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+
+def rebuild_revenue_rollup_if_empty(db: Session) -> int:
+    """Lúc khởi động: bảng tổng hợp trống mà đã có phiếu thu (lần đầu triển khai) thì tính lại"""
+    if db.execute(select(InvoiceRevenue.id).limit(1)).first() is not None:
+        return 0
+    if db.execute(select(Invoice.id).limit(1)).first() is None:
+        return 0
+    return rebuild_revenue_rollup(db)
+
+
+if __name__ == "__main__":
+    # python -m services.revenue
+    from database.init_db import SessionLocal, create_table_db
+
+    create_table_db()
+    db = SessionLocal()
+    try:
+        rows = rebuild_revenue_rollup(db)
+        print(f"Đã tính lại bảng tổng hợp doanh thu: {rows} dòng")
+    finally:
+        db.close()
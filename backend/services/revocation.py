@@ -0,0 +1,128 @@
+import calendar
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.account import Account
+from models.refresh_token import RefreshToken
+
+
+def to_timestamp(value: datetime) -> int:
+    """datetime UTC trong DB (naive hoặc có tz) -> epoch giây, cùng đơn vị với iat"""
+    return calendar.timegm(value.utctimetuple())
+
+
+class RevokedAccounts:
+    """
+    Danh sách account bị khóa trong bộ nhớ, kiểm tra ở mỗi request mà không cần DB.
+    Chỉ là lớp chặn nhanh: mỗi mục sống tối đa ttl_seconds (bằng TTL cache account),
+    sau đó trạng thái thật lấy lại từ cột account.is_active qua load_account.
+    Nhờ vậy account được mở khóa ở worker khác cũng không bị chặn mãi ở worker này.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._ids: Dict[int, float] = {}
+
+    def load(self, db: Session) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        ids = db.execute(select(Account.id).where(Account.is_active == False)).scalars()
+        with self._lock:
+            self._ids = {account_id: expires_at for account_id in ids}
+
+    def revoke(self, account_ids: Iterable[int]) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._ids.update((account_id, expires_at) for account_id in account_ids)
+
+    def restore(self, account_ids: Iterable[int]) -> None:
+        with self._lock:
+            for account_id in account_ids:
+                self._ids.pop(account_id, None)
+
+    def is_revoked(self, account_id: int) -> bool:
+        expires_at = self._ids.get(account_id)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            with self._lock:
+                if self._ids.get(account_id) == expires_at:
+                    del self._ids[account_id]
+            return False
+        return True
+
+
+class RevokedTokens:
+    """
+    Access token bị thu hồi trước hạn (logout, đổi mật khẩu), giữ trong bộ nhớ:
+    - jti -> thời điểm token hết hạn; hết hạn thì tự bỏ khỏi danh sách.
+    - account_id -> mốc thời gian: token cấp trước mốc này (iat) đều bị từ chối.
+      Mốc được lưu ở cột account.tokens_valid_after và nạp lại lúc khởi động.
+    Mục nào cũng chỉ sống tối đa ACCESS_TOKEN_EXPIRE_MINUTES nên danh sách luôn nhỏ.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._jtis: Dict[str, float] = {}
+        self._not_before: Dict[int, float] = {}
+        self._next_purge = 0.0
+
+    def load(self, db: Session) -> None:
+        """Nạp lại jti đã thu hồi và mốc tokens_valid_after còn hạn từ DB (sau khi khởi động lại)"""
+        since = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        jtis = db.execute(
+            select(RefreshToken.access_jti).where(RefreshToken.revoked_at >= since)
+        ).scalars()
+        not_before = db.execute(
+            select(Account.id, Account.tokens_valid_after).where(Account.tokens_valid_after >= since)
+        ).all()
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            for jti in jtis:
+                self._jtis[jti] = expires_at
+            for account_id, valid_after in not_before:
+                self._not_before[account_id] = to_timestamp(valid_after)
+
+    def revoke(self, jti: str, expires_at: float = None) -> None:
+        with self._lock:
+            self._jtis[jti] = expires_at or time.time() + self.ttl_seconds
+            self._purge()
+
+    def revoke_account(self, account_id: int, not_before: int = None) -> int:
+        # iat trong JWT tính theo giây: token cấp ngay sau mốc (cùng giây) vẫn hợp lệ
+        not_before = not_before or int(time.time())
+        with self._lock:
+            self._not_before[account_id] = max(not_before, self._not_before.get(account_id, 0))
+            self._purge()
+        return not_before
+
+    def is_revoked(self, jti: str, account_id: int, issued_at: float) -> bool:
+        if jti in self._jtis:
+            return True
+        not_before = self._not_before.get(account_id)
+        return not_before is not None and issued_at < not_before
+
+    def _purge(self) -> None:
+        now = time.time()
+        if now < self._next_purge:
+            return
+        self._next_purge = now + 60
+        self._jtis = {jti: exp for jti, exp in self._jtis.items() if exp > now}
+        self._not_before = {
+            account_id: ts for account_id, ts in self._not_before.items()
+            if ts + self.ttl_seconds > now
+        }
+
+    def __len__(self) -> int:
+        return len(self._jtis) + len(self._not_before)
+
+
+revoked_accounts = RevokedAccounts(settings.ACCOUNT_CACHE_TTL_SECONDS)
+revoked_tokens = RevokedTokens(settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
@@ -0,0 +1,159 @@
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.contract import Contract
+from models.reservation import Reservation
+from models.room import Room
+from models.students import Student
+from helpers.contract_status import ContractStatus
+from helpers.gender_enum import GenderEnum
+from helpers.reservation_status import ReservationStatus
+
+# Phòng đang có cả nam và nữ (dữ liệu cũ): không xếp thêm ai vào
+MIXED = "MIXED"
+
+
+@dataclass
+class PendingRequest:
+    reservation_id: int
+    student_id: int
+    gender: GenderEnum
+    requested_room_id: int
+    booking_date: Optional[datetime]
+
+
+@dataclass
+class RoomSlot:
+    room_id: int
+    free_seats: int
+    gender: Optional[str] = None
+
+
+@dataclass
+class Assignment:
+    reservation_id: int
+    student_id: int
+    requested_room_id: int
+    room_id: Optional[int]
+    reason: str  # first_choice | reassigned | no_capacity
+
+
+def assign_rooms(requests: List[PendingRequest], rooms: List[RoomSlot]) -> List[Assignment]:
+    """
+    Xếp phòng cho hàng đợi reservation trong một lượt, O(n + m).
+    - Ai đặt trước (booking_date) được xếp trước.
+    - Ưu tiên phòng sinh viên đã chọn nếu còn chỗ và cùng giới tính.
+    - Nếu không, lấp tiếp phòng đang có người cùng giới tính, cuối cùng mới mở phòng trống.
+    """
+    free: Dict[int, int] = {}
+    gender: Dict[int, Optional[str]] = {}
+    open_rooms: Dict[str, Deque[int]] = {g: deque() for g in GenderEnum}
+    empty_rooms: Deque[int] = deque()
+
+    for room in rooms:
+        if room.free_seats <= 0 or room.gender == MIXED:
+            continue
+        free[room.room_id] = room.free_seats
+        gender[room.room_id] = room.gender
+        if room.gender is None:
+            empty_rooms.append(room.room_id)
+        else:
+            open_rooms[room.gender].append(room.room_id)
+
+    def take(room_id: int, g: GenderEnum) -> None:
+        free[room_id] -= 1
+        if gender[room_id] is None:
+            gender[room_id] = g
+            open_rooms[g].append(room_id)
+
+    def next_room(g: GenderEnum) -> Optional[int]:
+        # Phần tử hết chỗ / đã đổi giới tính được bỏ qua khi lấy ra (xóa lười)
+        rooms_of_gender = open_rooms[g]
+        while rooms_of_gender and free[rooms_of_gender[0]] <= 0:
+            rooms_of_gender.popleft()
+        if rooms_of_gender:
+            return rooms_of_gender[0]
+        while empty_rooms and gender[empty_rooms[0]] is not None:
+            empty_rooms.popleft()
+        if empty_rooms:
+            return empty_rooms.popleft()
+        return None
+
+    ordered = sorted(
+        requests,
+        key=lambda r: (r.booking_date or datetime.max, r.reservation_id),
+    )
+    assignments = []
+    for req in ordered:
+        g = GenderEnum(req.gender)
+        first = req.requested_room_id
+        if free.get(first, 0) > 0 and gender[first] in (None, g):
+            room_id, reason = first, "first_choice"
+        else:
+            room_id = next_room(g)
+            reason = "reassigned" if room_id is not None else "no_capacity"
+
+        if room_id is not None:
+            take(room_id, g)
+        assignments.append(Assignment(
+            reservation_id=req.reservation_id,
+            student_id=req.student_id,
+            requested_room_id=first,
+            room_id=room_id,
+            reason=reason,
+        ))
+    return assignments
+
+
+def load_assignment_input(db: Session, lock: bool = False) -> Tuple[List[PendingRequest], List[RoomSlot]]:
+    """Đọc hàng đợi PENDING và các phòng active còn chỗ bằng 3 query"""
+    pending_query = (
+        select(
+            Reservation.id,
+            Reservation.student_id,
+            Student.gender,
+            Reservation.room_id,
+            Reservation.booking_date,
+        )
+        .join(Student, Reservation.student_id == Student.id)
+        .where(Reservation.status == ReservationStatus.PENDING)
+    )
+    room_query = select(Room.id, Room.capacity, Room.current_occupancy).where(
+        Room.active == True,
+        Room.current_occupancy < Room.capacity,
+    )
+    if lock:
+        pending_query = pending_query.with_for_update(of=Reservation)
+        room_query = room_query.with_for_update()
+
+    requests = [PendingRequest(*row) for row in db.execute(pending_query)]
+
+    # Giới tính hiện tại của mỗi phòng, lấy từ người đang ở
+    occupant_genders: Dict[int, set] = {}
+    for room_id, g in db.execute(
+        select(Reservation.room_id, Student.gender)
+        .join(Student, Reservation.student_id == Student.id)
+        .join(Contract, Contract.reservation_id == Reservation.id)
+        .where(
+            Reservation.status == ReservationStatus.APPROVED,
+            Contract.status == ContractStatus.ACTIVE,
+        )
+        .group_by(Reservation.room_id, Student.gender)
+    ):
+        occupant_genders.setdefault(room_id, set()).add(GenderEnum(g))
+
+    rooms = []
+    for room_id, capacity, occupied in db.execute(room_query):
+        genders = occupant_genders.get(room_id, set())
+        if len(genders) > 1:
+            room_gender = MIXED
+        else:
+            room_gender = next(iter(genders), None)
+        rooms.append(RoomSlot(room_id=room_id, free_seats=capacity - occupied, gender=room_gender))
+
+    return requests, rooms
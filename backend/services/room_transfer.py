@@ -0,0 +1,128 @@
+from calendar import monthrange
+from datetime import date
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from models.contract import Contract
+from models.invoice import Invoice
+from models.reservation import Reservation
+from models.room import Room
+from helpers.contract_status import ContractStatus
+from helpers.invoice_status import InvoiceStatus
+from services.occupancy import release_seat, reserve_seat
+from services.revenue import add_revenue_delta, apply_revenue_deltas, new_revenue_deltas
+from services.waitlist import is_full_for_booking, promote_waitlist
+
+
+def transfer_contract(db: Session, contract_id: int, new_room_id: int, today: Optional[date] = None) -> dict:
+    """
+    Chuyển hợp đồng đang ACTIVE sang phòng khác trong transaction hiện tại (không commit).
+    - Chỉ khóa dòng contract của hợp đồng này và hai dòng room liên quan.
+    - Giảm / tăng số chỗ bằng UPDATE có điều kiện, theo thứ tự room id để tránh deadlock.
+    - Hóa đơn UNPAID của tháng hiện tại được tính lại theo số ngày ở mỗi phòng.
+    """
+    today = today or date.today()
+
+    contract = db.execute(
+        select(Contract.id, Contract.status, Contract.reservation_id, Reservation.room_id)
+        .join(Reservation, Contract.reservation_id == Reservation.id)
+        .where(Contract.id == contract_id)
+        .with_for_update(of=Contract)
+    ).first()
+    if not contract:
+        raise HTTPException(status_code=404, detail="Contract not found")
+    if contract.status != ContractStatus.ACTIVE:
+        raise HTTPException(status_code=400, detail="Only active contracts can be transferred")
+
+    old_room_id = contract.room_id
+    if old_room_id == new_room_id:
+        raise HTTPException(status_code=400, detail="Contract is already in this room")
+
+    # Khóa cả hai phòng theo thứ tự id rồi mới kiểm tra / đổi bộ đếm
+    rooms = {
+        room.id: room
+        for room in db.execute(
+            select(Room)
+            .where(Room.id.in_((old_room_id, new_room_id)))
+            .order_by(Room.id)
+            .with_for_update()
+        ).scalars()
+    }
+    new_room = rooms.get(new_room_id)
+    if not new_room or not new_room.active:
+        raise HTTPException(status_code=404, detail="Room not found")
+    # Suất đang giữ cho đơn PENDING (và hàng chờ phía sau) không được nhường cho lệnh chuyển
+    if is_full_for_booking(db, new_room):
+        raise HTTPException(status_code=400, detail="Room is full")
+
+    for room_id in sorted((old_room_id, new_room_id)):
+        if room_id == new_room_id:
+            if not reserve_seat(db, new_room_id):
+                raise HTTPException(status_code=400, detail="Room is full")
+        else:
+            release_seat(db, old_room_id)
+
+    # Chỉ chuyển nếu reservation vẫn ở phòng cũ (chống hai lệnh chuyển đồng thời)
+    moved = db.execute(
+        update(Reservation)
+        .where(
+            Reservation.id == contract.reservation_id,
+            Reservation.room_id == old_room_id,
+        )
+        .values(room_id=new_room_id)
+    ).rowcount
+    if moved != 1:
+        raise HTTPException(status_code=409, detail="Contract was transferred concurrently, please retry")
+
+    promote_waitlist(db, [old_room_id])
+
+    return {
+        "contract_id": contract_id,
+        "from_room_id": old_room_id,
+        "to_room_id": new_room_id,
+        "invoice": _prorate_current_invoice(db, contract_id, old_room_id, new_room, today),
+    }
+
+
+def _prorate_current_invoice(db: Session, contract_id: int, old_room_id: int, new_room, today: date) -> Optional[dict]:
+    invoice = db.execute(
+        select(Invoice.id, Invoice.amount, Invoice.room_id)
+        .where(
+            Invoice.contract_id == contract_id,
+            Invoice.month == today.month,
+            Invoice.year == today.year,
+            Invoice.status == InvoiceStatus.UNPAID,
+        )
+        .with_for_update()
+    ).first()
+    if not invoice:
+        return None
+
+    # Phần giá phòng mới chia theo số người ở sau khi đã chuyển vào
+    occupants = db.execute(
+        select(Room.current_occupancy).where(Room.id == new_room.id)
+    ).scalar_one()
+    new_share = new_room.price / max(occupants, 1)
+
+    days_in_month = monthrange(today.year, today.month)[1]
+    old_days = today.day - 1
+    new_days = days_in_month - old_days
+    amount = (invoice.amount * old_days + new_share * new_days) / days_in_month
+
+    db.execute(
+        update(Invoice)
+        .where(Invoice.id == invoice.id)
+        .values(amount=amount, room_id=new_room.id)
+    )
+
+    # Hóa đơn cũ chưa có room_id được tính vào phòng của reservation (như rebuild_revenue_rollup)
+    deltas = new_revenue_deltas()
+    old_key_room = invoice.room_id or old_room_id
+    add_revenue_delta(deltas, (today.year, today.month, old_key_room, InvoiceStatus.UNPAID), -1, -invoice.amount)
+    add_revenue_delta(deltas, (today.year, today.month, new_room.id, InvoiceStatus.UNPAID), 1, amount)
+    apply_revenue_deltas(db, deltas)
+
+    return {"invoice_id": invoice.id, "old_amount": invoice.amount, "new_amount": amount}
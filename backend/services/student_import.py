@@ -0,0 +1,134 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from helpers.user_role import UserRole
+from models.account import Account
+from models.students import Student
+from schemas.account import AccountCreate
+
+STUDENT_IMPORT_BATCH_SIZE = 500
+
+# Các cột phải là duy nhất: (tên cột, cột trong DB)
+UNIQUE_FIELDS = (
+    ("username", Account.username),
+    ("phone", Student.phone),
+    ("email", Student.email),
+)
+
+
+@dataclass
+class StudentImportPlan:
+    valid: List[AccountCreate] = field(default_factory=list)
+    rows: List[int] = field(default_factory=list)
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def _unique_values(data: AccountCreate) -> Dict[str, str]:
+    return {
+        "username": data.username,
+        "phone": data.student.phone,
+        "email": data.student.email,
+    }
+
+
+def validate_student_rows(db: Session, raw_rows: List[Dict[str, Any]]) -> StudentImportPlan:
+    """
+    Kiểm tra toàn bộ file trong một lượt:
+    - Từng dòng qua AccountCreate / StudentCreate.
+    - Trùng username / phone / email trong file hoặc với dữ liệu đã có (mỗi cột một query / lô).
+    """
+    plan = StudentImportPlan()
+    candidates = []
+    seen: Dict[str, Dict[str, int]] = {name: {} for name, _ in UNIQUE_FIELDS}
+
+    for index, raw in enumerate(raw_rows, start=1):
+        raw = {k: (v.strip() if isinstance(v, str) else v) for k, v in raw.items() if k}
+        try:
+            data = AccountCreate(
+                username=raw.get("username"),
+                password=raw.get("password"),
+                student={
+                    "full_name": raw.get("full_name"),
+                    "birth": raw.get("birth"),
+                    "gender": (raw.get("gender") or "").upper(),
+                    "phone": raw.get("phone"),
+                    "email": raw.get("email"),
+                },
+            )
+        except ValidationError as e:
+            plan.errors.append({
+                "row": index,
+                "errors": [
+                    f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+                ],
+            })
+            continue
+
+        conflicts = []
+        for name, value in _unique_values(data).items():
+            if value in seen[name]:
+                conflicts.append(f"{name} trùng với dòng {seen[name][value]}")
+            else:
+                seen[name][value] = index
+        if conflicts:
+            plan.errors.append({"row": index, "username": data.username, "errors": conflicts})
+            continue
+        candidates.append((index, data))
+
+    existing: Dict[str, set] = {}
+    for name, column in UNIQUE_FIELDS:
+        values = [_unique_values(data)[name] for _, data in candidates]
+        existing[name] = set()
+        for i in range(0, len(values), STUDENT_IMPORT_BATCH_SIZE):
+            existing[name].update(
+                db.execute(select(column).where(column.in_(values[i:i + STUDENT_IMPORT_BATCH_SIZE]))).scalars()
+            )
+
+    for index, data in candidates:
+        conflicts = [
+            f"{name} đã tồn tại"
+            for name, value in _unique_values(data).items()
+            if value in existing[name]
+        ]
+        if conflicts:
+            plan.errors.append({"row": index, "username": data.username, "errors": conflicts})
+        else:
+            plan.valid.append(data)
+            plan.rows.append(index)
+
+    plan.errors.sort(key=lambda e: e["row"])
+    return plan
+
+
+def insert_students(db: Session, students: List[AccountCreate], password_hashes: List[str]) -> int:
+    """
+    Ghi theo lô bằng executemany: INSERT account -> SELECT id theo username -> INSERT student.
+    Commit một lần ở cuối; lỗi unique (ghi đồng thời) thì rollback cả lô.
+    """
+    for i in range(0, len(students), STUDENT_IMPORT_BATCH_SIZE):
+        batch = students[i:i + STUDENT_IMPORT_BATCH_SIZE]
+        hashes = password_hashes[i:i + STUDENT_IMPORT_BATCH_SIZE]
+        db.execute(insert(Account), [
+            {"username": data.username, "password": password_hash, "role": UserRole.STUDENT}
+            for data, password_hash in zip(batch, hashes)
+        ])
+        account_ids = dict(db.execute(
+            select(Account.username, Account.id).where(Account.username.in_([d.username for d in batch]))
+        ).all())
+        db.execute(insert(Student), [
+            {
+                "account_id": account_ids[data.username],
+                "full_name": data.student.full_name,
+                "birth": data.student.birth,
+                "gender": data.student.gender,
+                "phone": data.student.phone,
+                "email": data.student.email,
+            }
+            for data in batch
+        ])
+    db.commit()
+    return len(students)
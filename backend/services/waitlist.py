@@ -0,0 +1,78 @@
+from typing import Iterable, List
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from models.reservation import Reservation
+from models.room import Room
+from helpers.reservation_status import ReservationStatus
+
+
+# Số reservation PENDING đang giữ suất của phòng (dùng index (room_id, status))
+def pending_count(db: Session, room_id: int) -> int:
+    return db.execute(
+        select(func.count(Reservation.id)).where(
+            Reservation.room_id == room_id,
+            Reservation.status == ReservationStatus.PENDING,
+        )
+    ).scalar_one()
+
+
+def is_full_for_booking(db: Session, room: Room) -> bool:
+    """Phòng hết suất khi số người đang ở + số đơn chờ duyệt đã bằng capacity"""
+    if room.current_occupancy >= room.capacity:
+        return True
+    return room.current_occupancy + pending_count(db, room.id) >= room.capacity
+
+
+def waitlist_position(db: Session, reservation: Reservation) -> int:
+    return db.execute(
+        select(func.count(Reservation.id)).where(
+            Reservation.room_id == reservation.room_id,
+            Reservation.status == ReservationStatus.WAITLISTED,
+            Reservation.id <= reservation.id,
+        )
+    ).scalar_one()
+
+
+# Đưa người đứng đầu hàng chờ lên PENDING khi phòng có suất trống.
+# Không commit: gọi trong cùng transaction với thao tác giải phóng suất.
+def promote_waitlist(db: Session, room_ids: Iterable[int]) -> List[int]:
+    promoted = []
+    for room_id in sorted(set(room_ids)):
+        # Khóa dòng phòng để hai lần giải phóng đồng thời không cùng đẩy một suất
+        room = db.execute(
+            select(Room.capacity, Room.current_occupancy)
+            .where(Room.id == room_id)
+            .with_for_update()
+        ).first()
+        if room is None:
+            continue
+
+        free = room.capacity - room.current_occupancy - pending_count(db, room_id)
+        if free <= 0:
+            continue
+
+        head = list(db.execute(
+            select(Reservation.id)
+            .where(
+                Reservation.room_id == room_id,
+                Reservation.status == ReservationStatus.WAITLISTED,
+            )
+            .order_by(Reservation.id)
+            .limit(free)
+            .with_for_update()
+        ).scalars())
+        if not head:
+            continue
+
+        db.execute(
+            update(Reservation)
+            .where(
+                Reservation.id.in_(head),
+                Reservation.status == ReservationStatus.WAITLISTED,
+            )
+            .values(status=ReservationStatus.PENDING)
+        )
+        promoted.extend(head)
+    return promoted
@@ -0,0 +1,9 @@
+# Biến môi trường tối thiểu cho Settings; chạy: python -m unittest discover -s tests -t .
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db"))
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("HF_TOKEN", "test")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
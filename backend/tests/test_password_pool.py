@@ -0,0 +1,40 @@
+import asyncio
+import time
+import unittest
+
+from helpers.pwd import PasswordHasherPool
+
+
+# Top-level để pickle được sang process con; trả về khoảng thời gian chạy của item
+def _timed_item(item):
+  started = time.time()
+  time.sleep(0.3)
+  return (item , started , time.time())
+
+
+class PasswordHasherPoolMapTest(unittest.TestCase):
+
+  def setUp(self):
+    self.pool = PasswordHasherPool(workers=2 , max_queue=4)
+
+  def tearDown(self):
+    self.pool.shutdown()
+
+  def test_chunks_run_concurrently(self):
+    results = asyncio.run(self.pool.map(_timed_item , list(range(4)) , chunksize=1))
+
+    self.assertEqual([item for item , _ , _ in results] , [0 , 1 , 2 , 3])
+    # Hai chunk đầu phải chạy chồng lên nhau trên hai worker, không nối tiếp
+    (_ , start_a , end_a) , (_ , start_b , end_b) = results[:2]
+    self.assertLess(max(start_a , start_b) , min(end_a , end_b))
+
+  def test_chunks_count_towards_pool_stats(self):
+    asyncio.run(self.pool.map(_timed_item , list(range(3)) , chunksize=2))
+
+    stats = self.pool.stats()
+    self.assertEqual(stats["completed"] , 2)
+    self.assertEqual(stats["in_flight"] , 0)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from datetime import date, datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.reservation_contact import admin_router
+from database.init_db import SessionLocal, create_table_db, engine
+from helpers.reservation_status import ReservationStatus
+from helpers.user_role import UserRole
+from models.account import Account
+from models.base import Base
+from models.reservation import Reservation
+from models.room import Room
+from models.students import Student
+from schemas.token import TokenData
+from services.auth import admin_required
+
+
+class ListReservationsTest(unittest.TestCase):
+  """Phân trang keyset /admin/reservations khi start_date có dòng NULL"""
+
+  def setUp(self):
+    create_table_db()
+    db = SessionLocal()
+    room = Room(room_code="A1", capacity=4, price=1000, active=True)
+    db.add(room)
+    db.flush()
+    # 3 dòng có start_date, 4 dòng NULL (pending / waitlisted / rejected)
+    start_dates = [date(2025, 3, 1), None, date(2025, 1, 1), None, date(2025, 1, 1), None, None]
+    statuses = [ReservationStatus.APPROVED, ReservationStatus.PENDING, ReservationStatus.APPROVED,
+                ReservationStatus.WAITLISTED, ReservationStatus.APPROVED, ReservationStatus.REJECTED,
+                ReservationStatus.PENDING]
+    for i, (start_date, status) in enumerate(zip(start_dates, statuses)):
+      account = Account(username=f"s{i}", password="x", role=UserRole.STUDENT)
+      db.add(account)
+      db.flush()
+      student = Student(account_id=account.id, full_name=f"S {i}", birth=datetime(2000, 1, 1),
+                        gender="MALE", phone=f"09{i:08d}", email=f"s{i}@x.com")
+      db.add(student)
+      db.flush()
+      db.add(Reservation(student_id=student.id, room_id=room.id, booking_date=datetime(2025, 1, i + 1),
+                         start_date=start_date, status=status))
+    db.commit()
+    db.close()
+
+    app = FastAPI()
+    app.include_router(admin_router)
+    app.dependency_overrides[admin_required] = lambda: TokenData(user_id="1", role="admin")
+    self.client = TestClient(app)
+
+  def tearDown(self):
+    Base.metadata.drop_all(bind=engine)
+
+  def _pages(self, order, limit):
+    ids, cursor = [], None
+    while True:
+      params = {"sort_by": "start_date", "order": order, "limit": limit}
+      if cursor:
+        params["cursor"] = cursor
+      response = self.client.get("/admin/reservations", params=params)
+      self.assertEqual(response.status_code, 200)
+      body = response.json()
+      ids.extend(r["reservation_id"] for r in body["data"])
+      cursor = body["next_cursor"]
+      if not cursor:
+        return ids
+
+  def test_null_start_dates_are_listed_across_pages(self):
+    # asc: (start_date, id) có giá trị trước, NULL sau theo id
+    expected = [3, 5, 1, 2, 4, 6, 7]
+    for limit in (1, 2, 3, 50):
+      self.assertEqual(self._pages("asc", limit), expected)
+      self.assertEqual(self._pages("desc", limit), expected[::-1])
+
+  def test_invalid_cursor_value(self):
+    response = self.client.get("/admin/reservations", params={"sort_by": "start_date", "cursor": "WzEsMl0"})
+    self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+  unittest.main()